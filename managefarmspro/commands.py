@@ -0,0 +1,27 @@
+import click
+from frappe.commands import get_site, pass_context
+
+
+@click.command("rebuild-work-cost-rollup")
+@pass_context
+def rebuild_work_cost_rollup(context):
+	"""Recreate the Work Cost Daily Rollup from submitted works"""
+	import frappe
+
+	from managefarmspro.managefarmspro.doctype.work_cost_daily_rollup.work_cost_daily_rollup import (
+		rebuild_work_cost_rollup as rebuild,
+	)
+
+	site = get_site(context)
+	frappe.init(site=site)
+	frappe.connect()
+	try:
+		rows = rebuild()
+		frappe.db.commit()
+	finally:
+		frappe.destroy()
+
+	click.echo(f"Rebuilt Work Cost Daily Rollup for {site}: {rows} rows")
+
+
+commands = [rebuild_work_cost_rollup]
@@ -30,7 +30,8 @@ app_license = "mit"
 app_include_js = [
     "/assets/managefarmspro/js/customer_list.js",
     "/assets/managefarmspro/js/customer_form.js",
-    "/assets/managefarmspro/js/sales_invoice_form.js"
+    "/assets/managefarmspro/js/sales_invoice_form.js",
+    "/assets/managefarmspro/js/work_history.js"
 ]
 
 # include js, css files in header of web template
@@ -195,6 +196,12 @@ doc_events = {
 # 	],
 # }
 
+scheduler_events = {
+    "monthly": [
+        "managefarmspro.tasks.reset_monthly_maintenance_balances"
+    ]
+}
+
 # Testing
 # -------
 
@@ -280,6 +287,11 @@ override_doctype_dashboards = {
 # default_log_clearing_doctypes = {
 # 	"Logging DocType Name": 30  # days to retain logs
 # }
+
+default_log_clearing_doctypes = {
+    "Slow Operation Log": 30
+}
+
 fixtures = [
     {
         "dt": "Custom Field",
@@ -1,8 +1,9 @@
 // Copyright (c) 2025, Khalandar Sihan and contributors
 // For license information, please see license.txt
 
-// frappe.ui.form.on("Cluster", {
-// 	refresh(frm) {
-
-// 	},
-// });
+frappe.ui.form.on("Cluster", {
+  refresh: function (frm) {
+    // Work history is loaded page by page from the Work list
+    managefarmspro.work_history.render(frm, { cluster: frm.doc.name });
+  },
+});
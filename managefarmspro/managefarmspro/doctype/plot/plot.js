@@ -6,6 +6,9 @@ frappe.ui.form.on("Plot", {
     // Setup real-time updates for the form
     setupRealtimeUpdates(frm);
 
+    // Work history is loaded page by page from the Work list
+    managefarmspro.work_history.render(frm, { plot: frm.doc.name });
+
     // Format the monthly maintenance budget with currency symbol
     let value = frm.doc.monthly_maintenance_budget || 0;
     let formatted_value = format_currency(
@@ -1,48 +1,59 @@
 import frappe
 from frappe.model.document import Document
-from frappe.utils import get_first_day, get_last_day, getdate
+from frappe.utils import flt, get_first_day, getdate
+
+from managefarmspro.managefarmspro.doctype.plot_monthly_spend.plot_monthly_spend import get_month_work_cost
+from managefarmspro.utils.instrumentation import instrument
+from managefarmspro.utils.report_cache import invalidate_report_cache
+
+
+def get_plot_doc(name):
+	"""Return the Plot, loading it from the database at most once per request.
+
+	The copy is dropped whenever the Plot is written, see clear_plot_doc_cache.
+	"""
+	if not hasattr(frappe.local, "plot_doc_cache"):
+		frappe.local.plot_doc_cache = {}
+
+	if name not in frappe.local.plot_doc_cache:
+		frappe.local.plot_doc_cache[name] = frappe.get_doc("Plot", name)
+
+	return frappe.local.plot_doc_cache[name]
+
+
+def clear_plot_doc_cache(name=None):
+	"""Forget the request-local copy of one Plot, or of all Plots"""
+	cache = getattr(frappe.local, "plot_doc_cache", None)
+	if not cache:
+		return
+
+	if name:
+		cache.pop(name, None)
+	else:
+		cache.clear()
+
+
+def on_doctype_update():
+	# Reports and dashboards filter plots by cluster and by customer
+	frappe.db.add_index("Plot", ["cluster"], "cluster_index")
+	frappe.db.add_index("Plot", ["customer_name"], "customer_name_index")
 
 
 class Plot(Document):
 	def onload(self):
-		"""Updates total_amount_spent on form load for the current month"""
-		self.update_current_month_spending()
-
-	def update_current_month_spending(self):
-		current_date = getdate()
-		month_start = get_first_day(current_date)
-		month_end = get_last_day(current_date)
-
-		# Get total spent from submitted works for current month
-		# Including supervision charge in the calculation
-		total_spent = frappe.db.sql(
-			"""
-			SELECT COALESCE(SUM(total_cost + (total_cost * %s / 100)), 0)
-			FROM tabWork
-			WHERE plot = %s
-			AND docstatus = 1
-			AND work_date BETWEEN %s AND %s
-		""",
-			(self.supervision_charges or 0, self.name, month_start, month_end),
-		)[0][0]
-
-		# Update the total_amount_spent
-		self.db_set("total_amount_spent", total_spent, update_modified=False)
-
-		# If monthly maintenance budget exists, update the maintenance balance
-		if self.monthly_maintenance_budget:
-			self.db_set(
-				"maintenance_balance", self.monthly_maintenance_budget - total_spent, update_modified=False
-			)
+		"""Shows this month's spending and balance on the form, writing them back only when they changed"""
+		self.refresh_maintenance_budget()
+
+	def get_current_month_spending(self):
+		"""Total spent this month including supervision charges, read from the Plot Monthly Spend ledger"""
+		work_cost = get_month_work_cost(self.name)
+		return work_cost + (work_cost * flt(self.supervision_charges) / 100)
 
+	@instrument()
 	def validate(self):
-		# Sync maintenance_balance when monthly_maintenance_budget changes
+		# Sync maintenance_balance when monthly_maintenance_budget changes, keeping this month's spending
 		if self.has_value_changed("monthly_maintenance_budget"):
-			self.maintenance_balance = self.monthly_maintenance_budget
-
-		# Only proceed with maintenance checks if budget is set
-		if self.monthly_maintenance_budget:
-			self.check_monthly_reset()
+			self.maintenance_balance = flt(self.monthly_maintenance_budget) - flt(self.total_amount_spent)
 
 	def before_insert(self):
 		if self.monthly_maintenance_budget:
@@ -53,28 +64,52 @@ class Plot(Document):
 			# self.db_update()
 			# frappe.db.commit()
 
-	def check_monthly_reset(self):
-		if not self.monthly_maintenance_budget:
-			return
+	def refresh_maintenance_budget(self):
+		"""Bring the budget fields up to date for the current month without saving the Plot.
 
-		current_date = getdate()
-		month_start = get_first_day(current_date)
-		last_reset_date = self.get("last_maintenance_reset") or month_start
+		Only maintenance_balance, total_amount_spent and last_maintenance_reset are written,
+		and only when they differ from the stored values. Returns the total spent this month.
+		"""
+		total_spent = self.get_current_month_spending()
+		values = {"total_amount_spent": total_spent}
 
-		if getdate(last_reset_date) < month_start:
-			# First reset values for new month
-			self.db_set("maintenance_balance", self.monthly_maintenance_budget, update_modified=False)
-			self.db_set("total_amount_spent", 0, update_modified=False)
-			self.db_set("last_maintenance_reset", month_start, update_modified=False)
-
-			# Then update with any spending in current month
-			self.update_current_month_spending()
+		if self.monthly_maintenance_budget:
+			month_start = get_first_day(getdate())
+			values["maintenance_balance"] = self.monthly_maintenance_budget - total_spent
+			if not self.last_maintenance_reset or getdate(self.last_maintenance_reset) < month_start:
+				values["last_maintenance_reset"] = month_start
+
+		changed = {
+			fieldname: value
+			for fieldname, value in values.items()
+			if fieldname == "last_maintenance_reset"
+			or flt(self.get(fieldname), self.precision(fieldname)) != flt(value, self.precision(fieldname))
+		}
+		if changed:
+			self.update(changed)
+			if not self.is_new():
+				frappe.db.set_value("Plot", self.name, changed, update_modified=False)
+				clear_plot_doc_cache(self.name)
+				invalidate_report_cache(plot=self.name, cluster=self.cluster, after_commit=True)
+
+		return total_spent
 
 	def before_save(self):
 		# Capture the old cluster value before it's modified during the update
-		self.previous_cluster_name = frappe.db.get_value("Plot", self.name, "cluster_name", cache=False)
+		doc_before_save = self.get_doc_before_save()
+		self.previous_cluster = doc_before_save.cluster if doc_before_save else None
+		self.previous_cluster_name = doc_before_save.cluster_name if doc_before_save else None
 
+	@instrument()
 	def on_update(self):
+		clear_plot_doc_cache(self.name)
+
+		# Budget, cluster or customer changes all show up in the cached report results
+		invalidate_report_cache(plot=self.name, cluster=self.cluster, after_commit=True)
+		if self.previous_cluster and self.previous_cluster != self.cluster:
+			self.move_work_cost_rollup()
+			invalidate_report_cache(cluster=self.previous_cluster, after_commit=True)
+
 		# Handle updates to the Plot and corresponding Cluster
 		if self.previous_cluster_name and self.previous_cluster_name != self.cluster_name:
 			self.remove_from_previous_cluster(self.previous_cluster_name)
@@ -83,11 +118,21 @@ class Plot(Document):
 		self.update_customer_custom_plot_details()
 		self.update_cluster_plots()
 
-		# Fetch work data dynamically, assuming it's passed in self
-		if hasattr(self, "work_details"):
-			for work in self.work_details:
-				self.update_plot_work_details(work)
-				self.update_cluster_work_details(work)
+	@instrument()
+	def on_trash(self):
+		clear_plot_doc_cache(self.name)
+		invalidate_report_cache(plot=self.name, cluster=self.cluster, after_commit=True)
+
+	def move_work_cost_rollup(self):
+		"""Re-key this plot's Work Cost Daily Rollup rows to its new cluster.
+
+		Reports group and filter the rollup by its stored cluster, so without this the plot's
+		history would keep counting under the cluster it left. All of a plot's rows share one
+		cluster, so moving them can't collide with rows already under the new key.
+		"""
+		frappe.db.set_value(
+			"Work Cost Daily Rollup", {"plot": self.name}, "cluster", self.cluster or "", update_modified=False
+		)
 
 	def remove_from_previous_cluster(self, previous_cluster_name):
 		try:
@@ -173,69 +218,3 @@ class Plot(Document):
 					f"Cluster {cluster_name} not found while creating/updating Plot {self.name}",
 					"Populate Plots Error",
 				)
-
-	def update_plot_work_details(self, work_data):
-		# This method updates the Work details in the Plot's child table
-		exists = False
-		for work in self.work_details:  # Assuming work_details is the child table in Plot
-			if work.work_id == work_data.work_id:
-				# If the work entry already exists in the plot, update it
-				work.work_name = work_data.work_name
-				work.work_date = work_data.work_date
-				work.status = work_data.status
-				work.total_cost = work_data.total_cost
-				exists = True
-				break
-
-		if not exists:
-			# Add a new row to the Plot's work child table
-			self.append(
-				"work_details",
-				{
-					"work_id": work_data.work_id,
-					"work_name": work_data.work_name,
-					"work_date": work_data.work_date,
-					"status": work_data.status,
-					"total_cost": work_data.total_cost,
-				},
-			)
-
-	def update_cluster_work_details(self, work_data):
-		# Update the Work details in the Cluster's child table
-		cluster_name = self.cluster_name
-		if cluster_name:
-			try:
-				cluster_doc = frappe.get_doc("Cluster", cluster_name)
-
-				exists = False
-				for cluster_work in cluster_doc.work_details:
-					if cluster_work.work_id == work_data.work_id:
-						# If the work entry already exists in the cluster, update it
-						cluster_work.work_name = work_data.work_name
-						cluster_work.work_date = work_data.work_date
-						cluster_work.status = work_data.status
-						cluster_work.total_cost = work_data.total_cost
-						exists = True
-						break
-
-				if not exists:
-					# Add a new row to the Cluster's work child table
-					cluster_doc.append(
-						"work_details",
-						{
-							"work_id": work_data.work_id,
-							"work_name": work_data.work_name,
-							"work_date": work_data.work_date,
-							"status": work_data.status,
-							"total_cost": work_data.total_cost,
-						},
-					)
-				# Save the Cluster document
-				cluster_doc.save()
-
-			except frappe.DoesNotExistError:
-				frappe.msgprint(f"Error: Cluster {cluster_name} does not exist.")
-				frappe.log_error(
-					f"Cluster {cluster_name} not found while updating work details for Plot {self.name}",
-					"Update Work Details Error",
-				)
\ No newline at end of file
@@ -1,9 +1,49 @@
 # Copyright (c) 2025, Khalandar Sihan and Contributors
 # See license.txt
 
-# import frappe
+import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from managefarmspro.managefarmspro.doctype.plot.plot import clear_plot_doc_cache, get_plot_doc
+
+
+def make_plot(plot_name="_Test Plot", monthly_maintenance_budget=1000, supervision_charges=10):
+	if not frappe.db.exists("Cluster", "_Test Cluster"):
+		frappe.get_doc({"doctype": "Cluster", "cluster_name": "_Test Cluster"}).insert()
+
+	if frappe.db.exists("Plot", plot_name):
+		return frappe.get_doc("Plot", plot_name)
+
+	return frappe.get_doc(
+		{
+			"doctype": "Plot",
+			"plot_name": plot_name,
+			"area": 1,
+			"units": "Acre",
+			"cluster": "_Test Cluster",
+			"monthly_maintenance_budget": monthly_maintenance_budget,
+			"supervision_charges": supervision_charges,
+		}
+	).insert()
+
 
 class TestPlot(FrappeTestCase):
-	pass
+	def setUp(self):
+		clear_plot_doc_cache()
+
+	def test_plot_is_loaded_once_per_request(self):
+		plot = make_plot()
+
+		get_plot_doc(plot.name)
+		with self.assertQueryCount(0):
+			self.assertEqual(get_plot_doc(plot.name).name, plot.name)
+
+	def test_plot_cache_is_cleared_on_save(self):
+		plot = make_plot()
+		cached = get_plot_doc(plot.name)
+
+		plot.preferred_plot_name = "Renamed"
+		plot.save()
+
+		self.assertIsNot(get_plot_doc(plot.name), cached)
+		self.assertEqual(get_plot_doc(plot.name).preferred_plot_name, "Renamed")
@@ -0,0 +1,103 @@
+# Copyright (c) 2025, Khalandar Sihan and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import flt, get_first_day, getdate, now
+
+
+class PlotMonthlySpend(Document):
+	pass
+
+
+def on_doctype_update():
+	# One ledger row per plot and month, so balance reads are a single key lookup
+	frappe.db.add_unique("Plot Monthly Spend", ["plot", "month_start"], constraint_name="unique_plot_month")
+
+
+def get_month_work_cost(plot, date=None):
+	"""Return the summed total cost of submitted works on a plot for the month of `date`"""
+	month_start = get_first_day(getdate(date))
+	return flt(
+		frappe.db.get_value("Plot Monthly Spend", {"plot": plot, "month_start": month_start}, "total_cost")
+	)
+
+
+def record_work_cost(work, sign=1):
+	"""Apply a submitted (sign=1) or cancelled (sign=-1) Work to the ledger by delta"""
+	if not work.plot or not work.work_date:
+		return
+
+	timestamp = now()
+	frappe.db.sql(
+		"""
+		INSERT INTO `tabPlot Monthly Spend`
+			(name, plot, month_start, total_cost, work_count, creation, modified, owner, modified_by, docstatus, idx)
+		VALUES
+			(%(name)s, %(plot)s, %(month_start)s, %(total_cost)s, %(work_count)s,
+			%(timestamp)s, %(timestamp)s, %(user)s, %(user)s, 0, 0)
+		ON DUPLICATE KEY UPDATE
+			total_cost = total_cost + VALUES(total_cost),
+			work_count = work_count + VALUES(work_count),
+			modified = VALUES(modified),
+			modified_by = VALUES(modified_by)
+		""",
+		{
+			"name": frappe.generate_hash(length=10),
+			"plot": work.plot,
+			"month_start": get_first_day(getdate(work.work_date)),
+			"total_cost": sign * flt(work.total_cost),
+			"work_count": sign,
+			"timestamp": timestamp,
+			"user": frappe.session.user,
+		},
+	)
+
+
+def rebuild_plot_monthly_spend():
+	"""Recreate the whole ledger from submitted works"""
+	frappe.db.delete("Plot Monthly Spend")
+
+	rows = frappe.db.sql(
+		"""
+		SELECT plot, DATE_FORMAT(work_date, '%Y-%m-01') AS month_start,
+			COALESCE(SUM(total_cost), 0) AS total_cost, COUNT(*) AS work_count
+		FROM `tabWork`
+		WHERE docstatus = 1 AND plot IS NOT NULL AND work_date IS NOT NULL
+		GROUP BY plot, month_start
+		""",
+		as_dict=True,
+	)
+
+	timestamp = now()
+	user = frappe.session.user
+	frappe.db.bulk_insert(
+		"Plot Monthly Spend",
+		fields=[
+			"name",
+			"plot",
+			"month_start",
+			"total_cost",
+			"work_count",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+		],
+		values=[
+			(
+				frappe.generate_hash(length=10),
+				row.plot,
+				row.month_start,
+				row.total_cost,
+				row.work_count,
+				timestamp,
+				timestamp,
+				user,
+				user,
+			)
+			for row in rows
+		],
+	)
+
+	return len(rows)
@@ -0,0 +1,77 @@
+# Copyright (c) 2025, Khalandar Sihan and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import flt, get_first_day, get_last_day, getdate
+
+from managefarmspro.managefarmspro.doctype.plot.plot import clear_plot_doc_cache
+from managefarmspro.managefarmspro.doctype.plot.test_plot import make_plot
+from managefarmspro.managefarmspro.doctype.plot_monthly_spend.plot_monthly_spend import (
+	get_month_work_cost,
+	rebuild_plot_monthly_spend,
+)
+from managefarmspro.managefarmspro.doctype.work.test_work import make_work
+
+
+def get_ledger_rows(plot):
+	return frappe.get_all(
+		"Plot Monthly Spend",
+		filters={"plot": plot, "work_count": (">", 0)},
+		fields=["month_start", "total_cost", "work_count"],
+		order_by="month_start",
+	)
+
+
+def get_work_count(plot):
+	return frappe.db.get_value(
+		"Plot Monthly Spend", {"plot": plot, "month_start": get_first_day(getdate())}, "work_count"
+	)
+
+
+class TestPlotMonthlySpend(FrappeTestCase):
+	def setUp(self):
+		clear_plot_doc_cache()
+		self.plot = make_plot().name
+
+	def test_submit_and_cancel_update_ledger(self):
+		cost_before = get_month_work_cost(self.plot)
+		count_before = get_work_count(self.plot) or 0
+
+		work = make_work(self.plot, total_price=250)
+		work.submit()
+		self.assertEqual(get_month_work_cost(self.plot), cost_before + 250)
+		self.assertEqual(get_work_count(self.plot), count_before + 1)
+
+		work.cancel()
+		self.assertEqual(get_month_work_cost(self.plot), cost_before)
+		self.assertEqual(get_work_count(self.plot), count_before)
+
+	def test_month_work_cost_matches_works(self):
+		make_work(self.plot, total_price=120).submit()
+		make_work(self.plot, total_price=80).submit()
+		# Drafts are not spent yet
+		make_work(self.plot, total_price=40)
+
+		today = getdate()
+		expected = frappe.db.sql(
+			"""
+			SELECT COALESCE(SUM(total_cost), 0)
+			FROM `tabWork`
+			WHERE plot = %s AND docstatus = 1 AND work_date BETWEEN %s AND %s
+			""",
+			(self.plot, get_first_day(today), get_last_day(today)),
+		)[0][0]
+
+		self.assertEqual(get_month_work_cost(self.plot), flt(expected))
+
+	def test_rebuild_matches_incremental_ledger(self):
+		make_work(self.plot, total_price=60).submit()
+		cancelled = make_work(self.plot, total_price=30)
+		cancelled.submit()
+		cancelled.cancel()
+
+		incremental = get_ledger_rows(self.plot)
+		rebuild_plot_monthly_spend()
+
+		self.assertEqual(get_ledger_rows(self.plot), incremental)
@@ -0,0 +1,16 @@
+# Copyright (c) 2025, Khalandar Sihan and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder import Interval
+from frappe.query_builder.functions import Now
+
+
+class SlowOperationLog(Document):
+	"""Query count and timings of an instrumented operation that ran over the threshold"""
+
+	@staticmethod
+	def clear_old_logs(days=30):
+		table = frappe.qb.DocType("Slow Operation Log")
+		frappe.db.delete(table, filters=(table.modified < (Now() - Interval(days=days))))
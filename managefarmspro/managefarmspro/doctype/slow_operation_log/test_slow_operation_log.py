@@ -0,0 +1,44 @@
+# Copyright (c) 2025, Khalandar Sihan and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from managefarmspro.utils.instrumentation import instrumented
+
+
+class TestSlowOperationLog(FrappeTestCase):
+	def setUp(self):
+		self.conf = {
+			key: frappe.conf.get(key)
+			for key in ("managefarmspro_instrumentation", "managefarmspro_slow_operation_threshold_ms")
+		}
+		frappe.conf.managefarmspro_instrumentation = 1
+
+	def tearDown(self):
+		frappe.conf.update(self.conf)
+
+	def test_operation_over_threshold_is_queued(self):
+		frappe.conf.managefarmspro_slow_operation_threshold_ms = 0
+
+		with patch("managefarmspro.utils.instrumentation.deferred_insert") as deferred_insert:
+			with instrumented("_Test Slow Operation"):
+				frappe.db.sql("SELECT 1")
+
+		deferred_insert.assert_called_once()
+		doctype, records = deferred_insert.call_args.args
+		self.assertEqual(doctype, "Slow Operation Log")
+		self.assertEqual(records[0]["operation"], "_Test Slow Operation")
+		self.assertEqual(records[0]["query_count"], 1)
+		self.assertEqual(records[0]["rows_returned"], 1)
+
+	def test_operation_under_threshold_is_not_queued(self):
+		frappe.conf.managefarmspro_slow_operation_threshold_ms = 60 * 60 * 1000
+
+		with patch("managefarmspro.utils.instrumentation.deferred_insert") as deferred_insert:
+			with instrumented("_Test Fast Operation"):
+				frappe.db.sql("SELECT 1")
+
+		deferred_insert.assert_not_called()
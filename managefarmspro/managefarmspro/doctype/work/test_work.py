@@ -1,9 +1,129 @@
 # Copyright (c) 2025, Khalandar Sihan and Contributors
 # See license.txt
 
-# import frappe
+import os
+import traceback
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import frappe
 from frappe.tests.utils import FrappeTestCase
+from frappe.utils import getdate
+
+from managefarmspro.managefarmspro.doctype.plot.plot import clear_plot_doc_cache, get_plot_doc
+from managefarmspro.managefarmspro.doctype.plot.test_plot import make_plot
+from managefarmspro.managefarmspro.doctype.work.work import get_plot_balances
+
+APP_PATH = frappe.get_app_path("managefarmspro")
+
+
+@contextmanager
+def capture_app_queries():
+	"""Collect the statements issued from this app's code, leaving out the framework's own.
+
+	A statement belongs to the app when any frame below the test itself is app code, so
+	framework calls made by the app (get_doc, set_value) count and link checks, child table
+	writes and version bookkeeping do not.
+	"""
+	queries = []
+	db = frappe.local.db
+	sql = db.sql
+
+	def is_app_frame(frame):
+		return frame.filename.startswith(APP_PATH) and not os.path.basename(frame.filename).startswith("test_")
+
+	def spy(*args, **kwargs):
+		result = sql(*args, **kwargs)
+		if any(is_app_frame(frame) for frame in traceback.extract_stack()[:-1]):
+			queries.append(db.last_query)
+		return result
+
+	with patch.object(db, "sql", spy):
+		yield queries
+
+
+def make_work(plot, total_price=100):
+	if not frappe.db.exists("Work Item", "_Test Work Item"):
+		frappe.get_doc({"doctype": "Work Item", "work_item_name": "_Test Work Item"}).insert()
+
+	work = frappe.get_doc(
+		{
+			"doctype": "Work",
+			"plot": plot,
+			"work_name": "_Test Work Item",
+			"work_date": getdate(),
+		}
+	)
+	work.append("labor_table", {"number_of_labor_units": 1, "unit_price": total_price, "total_price": total_price})
+	return work.insert()
 
 
 class TestWork(FrappeTestCase):
-	pass
+	def setUp(self):
+		clear_plot_doc_cache()
+
+	def test_plot_balances_reuse_request_plot(self):
+		plot = make_plot()
+		get_plot_balances(plot.name)
+
+		# Only the monthly spend ledger lookup is left once the Plot is loaded
+		with self.assertQueryCount(1):
+			balances = get_plot_balances(plot.name)
+
+		self.assertEqual(balances["monthly_maintenance_budget"], plot.monthly_maintenance_budget)
+
+	def test_submit_hooks_query_count(self):
+		work = make_work(make_plot().name)
+		work.docstatus = 1
+		get_plot_doc(work.plot)
+
+		# Ledger and rollup upserts, last activity date, then the Plot reload, month spend
+		# lookup and totals write
+		with capture_app_queries() as queries:
+			work.run_method("on_submit")
+
+		self.assertEqual(len(queries), 6, queries)
+
+	def test_cancel_hooks_query_count(self):
+		work = make_work(make_plot().name)
+		work.submit()
+		work.docstatus = 2
+		get_plot_doc(work.plot)
+
+		# As on submit, plus removing the rollup row once its last work is cancelled
+		with capture_app_queries() as queries:
+			work.run_method("on_cancel")
+
+		self.assertEqual(len(queries), 7, queries)
+
+	def test_submit_query_count(self):
+		work = make_work(make_plot().name)
+		get_plot_doc(work.plot)
+
+		# validate only adds the month spend lookup: the Plot is no longer saved, and its
+		# before_save lookup and on_update Customer sync no longer run, on every submit
+		with capture_app_queries() as queries:
+			work.submit()
+
+		self.assertEqual(len(queries), 7, queries)
+		self.assertEqual(count_plot_loads(queries), 1, queries)
+
+	def test_cancel_query_count(self):
+		work = make_work(make_plot().name)
+		work.submit()
+		get_plot_doc(work.plot)
+
+		with capture_app_queries() as queries:
+			work.cancel()
+
+		self.assertEqual(len(queries), 7, queries)
+		self.assertEqual(count_plot_loads(queries), 1, queries)
+
+
+def count_plot_loads(queries):
+	"""Number of times the Plot document was read from tabPlot"""
+	return sum(
+		1
+		for query in queries
+		if query.lstrip().upper().startswith("SELECT") and "from `tabplot` where" in query.lower()
+	)
@@ -1,70 +1,118 @@
 import frappe
 from frappe.model.document import Document
-from frappe.utils import get_first_day, get_last_day, getdate
+from frappe.utils import cint, flt
+
+from managefarmspro.managefarmspro.doctype.plot.plot import clear_plot_doc_cache, get_plot_doc
+from managefarmspro.managefarmspro.doctype.plot_monthly_spend.plot_monthly_spend import record_work_cost
+from managefarmspro.managefarmspro.doctype.work_cost_daily_rollup.work_cost_daily_rollup import (
+	record_work_in_rollup,
+)
+from managefarmspro.utils.instrumentation import instrument
+from managefarmspro.utils.report_cache import invalidate_report_cache
+from managefarmspro.utils.report_filters import WORK_COLUMNS, compile_filters
+
+
+def on_doctype_update():
+	# Composite indexes for the ledger, report and invoicing lookups on submitted works
+	frappe.db.add_index("Work", ["plot", "docstatus", "work_date"], "plot_docstatus_work_date_index")
+	frappe.db.add_index("Work", ["docstatus", "invoice_number"], "docstatus_invoice_number_index")
+	frappe.db.add_index("Work", ["customer", "work_date"], "customer_work_date_index")
 
 
 class Work(Document):
+	@instrument()
 	def validate(self):
+		self.set_resource_costs()
+
 		if self.plot:
-			plot_doc = frappe.get_doc("Plot", self.plot)
+			plot_doc = get_plot_doc(self.plot)
 
 			# Only proceed with maintenance checks if plot has budget
 			if plot_doc.monthly_maintenance_budget:
-				# First ensure the plot is up to date with any monthly resets
-				plot_doc.check_monthly_reset()
-				plot_doc.save()
+				# Monthly resets are applied by the scheduled job, so this is a read-only lookup
+				total_spent = plot_doc.get_current_month_spending()
 
 				# Now get the current values
 				self.monthly_maintenance_budget = plot_doc.monthly_maintenance_budget
 
-				# Calculate total cost including supervision charges
-				current_date = getdate()
-				month_start = get_first_day(current_date)
-				month_end = get_last_day(current_date)
-
-				# Get total spent including supervision charges
-				total_spent = frappe.db.sql(
-					"""
-                    SELECT COALESCE(SUM(total_cost + (total_cost * %s / 100)), 0)
-                    FROM tabWork
-                    WHERE plot = %s
-                    AND docstatus = 1
-                    AND work_date BETWEEN %s AND %s
-                    """,
-					(plot_doc.supervision_charges or 0, self.plot, month_start, month_end),
-				)[0][0]
-
 				self.maintenance_balance = plot_doc.monthly_maintenance_budget - total_spent
 
+	def set_resource_costs(self):
+		"""Store the labor, material, equipment and supervision split of total_cost on the Work,
+		so reports read these columns instead of the child tables"""
+		self.labor_cost = sum(flt(row.total_price) for row in self.labor_table)
+		self.material_cost = sum(flt(row.total_price) for row in self.material_table)
+		self.equipment_cost = sum(flt(row.total_price) for row in self.equipment_table)
+		self.total_cost = self.labor_cost + self.material_cost + self.equipment_cost
+
+		supervision_charges = self.supervision_charges
+		if supervision_charges is None and self.plot:
+			supervision_charges = get_plot_doc(self.plot).supervision_charges
+		self.supervision_amount = flt(
+			self.total_cost * flt(supervision_charges) / 100, self.precision("supervision_amount")
+		)
+
+	@instrument()
 	def on_submit(self):
+		record_work_cost(self)
+		record_work_in_rollup(self)
+		self.invalidate_report_cache()
+		self.update_plot_last_activity()
 		self.update_plot_totals()
 
+	@instrument()
 	def on_cancel(self):
+		record_work_cost(self, sign=-1)
+		record_work_in_rollup(self, sign=-1)
+		self.invalidate_report_cache()
+		self.update_plot_last_activity(cancelled=True)
 		self.update_plot_totals()
 
+	def invalidate_report_cache(self):
+		# After commit, so reports can't be re-cached with this work's figures still uncommitted
+		if self.plot:
+			invalidate_report_cache(
+				plot=self.plot, cluster=get_plot_doc(self.plot).cluster, after_commit=True
+			)
+
+	def update_plot_last_activity(self, cancelled=False):
+		"""Keep Plot.last_activity_date at the latest submitted work date"""
+		if not self.plot or not self.work_date:
+			return
+
+		if cancelled:
+			# The cancelled work may have been the latest one, so look up the new latest date
+			frappe.db.sql(
+				"""
+				UPDATE `tabPlot`
+				SET last_activity_date = (
+					SELECT MAX(work_date) FROM `tabWork` WHERE plot = %(plot)s AND docstatus = 1
+				)
+				WHERE name = %(plot)s
+				""",
+				{"plot": self.plot},
+			)
+		else:
+			frappe.db.sql(
+				"""
+				UPDATE `tabPlot`
+				SET last_activity_date = GREATEST(COALESCE(last_activity_date, %(work_date)s), %(work_date)s)
+				WHERE name = %(plot)s
+				""",
+				{"plot": self.plot, "work_date": self.work_date},
+			)
+		clear_plot_doc_cache(self.plot)
+
 	def update_plot_totals(self):
 		if self.plot:
-			plot_doc = frappe.get_doc("Plot", self.plot)
+			plot_doc = get_plot_doc(self.plot)
 
 			# Skip if no maintenance budget is set
 			if not plot_doc.monthly_maintenance_budget:
 				return
 
-			current_date = getdate()
-			month_start = get_first_day(current_date)
-			month_end = get_last_day(current_date)
-
 			# Get total spent including supervision charges
-			total_spent = frappe.db.sql(
-				"""
-                SELECT COALESCE(SUM(total_cost + (total_cost * %s / 100)), 0)
-                FROM tabWork
-                WHERE plot = %s
-                AND docstatus = 1
-                AND work_date BETWEEN %s AND %s
-                """,
-				(plot_doc.supervision_charges or 0, self.plot, month_start, month_end),
-			)[0][0]
+			total_spent = plot_doc.get_current_month_spending()
 
 			# Update Plot document fields
 			frappe.db.set_value(
@@ -76,6 +124,7 @@ class Work(Document):
 				},
 				update_modified=False,
 			)
+			clear_plot_doc_cache(self.plot)
 
 			# Publish realtime update
 			frappe.publish_realtime(
@@ -92,30 +141,13 @@ class Work(Document):
 
 
 @frappe.whitelist()
+@instrument()
 def get_plot_balances(plot):
 	"""Get the current maintenance budget and balance for a plot"""
-	plot_doc = frappe.get_doc("Plot", plot)
+	plot_doc = get_plot_doc(plot)
 
-	# Only check monthly reset if maintenance budget exists
 	if plot_doc.monthly_maintenance_budget:
-		plot_doc.check_monthly_reset()
-		plot_doc.save()
-
-		current_date = getdate()
-		month_start = get_first_day(current_date)
-		month_end = get_last_day(current_date)
-
-		# Get total spent including supervision charges
-		total_spent = frappe.db.sql(
-			"""
-            SELECT COALESCE(SUM(total_cost + (total_cost * %s / 100)), 0)
-            FROM tabWork
-            WHERE plot = %s
-            AND docstatus = 1
-            AND work_date BETWEEN %s AND %s
-            """,
-			(plot_doc.supervision_charges or 0, plot, month_start, month_end),
-		)[0][0]
+		total_spent = plot_doc.get_current_month_spending()
 
 		return {
 			"monthly_maintenance_budget": plot_doc.monthly_maintenance_budget,
@@ -136,19 +168,37 @@ def calculate_total_cost(doc, method):
 	doc.db_set("total_cost", total_cost, update_modified=False)
 
 
-# Function to update the Work Child table in the Plot Doctype
-def update_work_child(doc, method):
-	work_child_data = {
-		"work_id": doc.name,
-		"work_name": doc.work_type_name,
-		"work_date": doc.work_date,
-		"status": {0: "Draft", 1: "Submitted", 2: "Cancelled"}.get(doc.docstatus, "Unknown"),
-		"total_cost": doc.total_cost,
-		"parent": doc.plot,
-		"parentfield": "work_details",
-		"parenttype": "Plot",
-	}
-	if frappe.db.exists("Work Child", {"parent": doc.plot, "work_id": doc.name}):
-		frappe.db.set_value("Work Child", {"parent": doc.plot, "work_id": doc.name}, work_child_data)
-	else:
-		frappe.get_doc({"doctype": "Work Child", **work_child_data}).insert()
+@frappe.whitelist()
+@instrument()
+def get_work_history(plot=None, cluster=None, start=0, page_length=20):
+	"""Page through the works of a plot or cluster, newest first, straight from tabWork"""
+	frappe.has_permission("Work", "read", throw=True)
+
+	if not plot and not cluster:
+		return {"works": [], "has_more": False}
+
+	start = cint(start)
+	page_length = cint(page_length) or 20
+	conditions, values = compile_filters({"plot": plot} if plot else {"cluster": cluster}, WORK_COLUMNS)
+	values.update({"limit": page_length + 1, "start": start})
+
+	works = frappe.db.sql(
+		f"""
+		SELECT
+			w.name AS work_id,
+			w.work_name,
+			w.work_date,
+			CASE w.docstatus WHEN 0 THEN 'Draft' WHEN 1 THEN 'Submitted' ELSE 'Cancelled' END AS status,
+			w.total_cost,
+			w.plot
+		FROM `tabWork` w
+		INNER JOIN `tabPlot` p ON p.name = w.plot
+		WHERE {" AND ".join(conditions)}
+		ORDER BY w.work_date DESC, w.name DESC
+		LIMIT %(limit)s OFFSET %(start)s
+		""",
+		values,
+		as_dict=True,
+	)
+
+	return {"works": works[:page_length], "has_more": len(works) > page_length}
@@ -0,0 +1,84 @@
+# Copyright (c) 2025, Khalandar Sihan and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import flt, getdate
+
+from managefarmspro.managefarmspro.doctype.plot.plot import clear_plot_doc_cache
+from managefarmspro.managefarmspro.doctype.plot.test_plot import make_plot
+from managefarmspro.managefarmspro.doctype.work.test_work import make_work
+from managefarmspro.managefarmspro.doctype.work_cost_daily_rollup.work_cost_daily_rollup import (
+	ROLLUP_COSTS,
+	ROLLUP_KEY,
+	rebuild_work_cost_rollup,
+)
+
+
+def get_rollup_rows(plot):
+	return frappe.get_all(
+		"Work Cost Daily Rollup",
+		filters={"plot": plot},
+		fields=[*ROLLUP_KEY, *ROLLUP_COSTS, "work_count"],
+		order_by="work_date, work_item, customer",
+	)
+
+
+def get_today_row(plot):
+	return frappe.db.get_value(
+		"Work Cost Daily Rollup",
+		{"plot": plot, "work_date": getdate(), "work_item": "_Test Work Item"},
+		["total_cost", "labor_cost", "work_count"],
+		as_dict=True,
+	) or frappe._dict(total_cost=0, labor_cost=0, work_count=0)
+
+
+class TestWorkCostDailyRollup(FrappeTestCase):
+	def setUp(self):
+		clear_plot_doc_cache()
+		self.plot = make_plot().name
+
+	def test_submit_and_cancel_update_rollup(self):
+		before = get_today_row(self.plot)
+
+		work = make_work(self.plot, total_price=250)
+		work.submit()
+		after_submit = get_today_row(self.plot)
+		self.assertEqual(flt(after_submit.total_cost), flt(before.total_cost) + 250)
+		self.assertEqual(flt(after_submit.labor_cost), flt(before.labor_cost) + 250)
+		self.assertEqual(after_submit.work_count, before.work_count + 1)
+
+		work.cancel()
+		after_cancel = get_today_row(self.plot)
+		self.assertEqual(flt(after_cancel.total_cost), flt(before.total_cost))
+		self.assertEqual(after_cancel.work_count, before.work_count)
+
+	def test_rebuild_matches_incremental_rollup(self):
+		make_work(self.plot, total_price=60).submit()
+		cancelled = make_work(self.plot, total_price=30)
+		cancelled.submit()
+		cancelled.cancel()
+
+		incremental = get_rollup_rows(self.plot)
+		rebuild_work_cost_rollup()
+
+		self.assertEqual(get_rollup_rows(self.plot), incremental)
+
+	def test_cluster_change_moves_rollup_rows(self):
+		if not frappe.db.exists("Cluster", "_Test Cluster 2"):
+			frappe.get_doc({"doctype": "Cluster", "cluster_name": "_Test Cluster 2"}).insert()
+
+		plot = make_plot("_Test Plot Moving")
+		make_work(plot.name, total_price=70).submit()
+
+		plot.reload()
+		new_cluster = "_Test Cluster" if plot.cluster == "_Test Cluster 2" else "_Test Cluster 2"
+		plot.cluster = new_cluster
+		plot.save()
+
+		self.assertEqual({row.cluster for row in get_rollup_rows(plot.name)}, {new_cluster})
+
+		# Same rows as rebuilding from the live Plot
+		incremental = get_rollup_rows(plot.name)
+		rebuild_work_cost_rollup()
+		self.assertEqual(get_rollup_rows(plot.name), incremental)
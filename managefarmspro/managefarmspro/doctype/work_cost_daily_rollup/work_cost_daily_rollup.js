@@ -0,0 +1,8 @@
+// Copyright (c) 2025, Khalandar Sihan and contributors
+// For license information, please see license.txt
+
+// frappe.ui.form.on("Work Cost Daily Rollup", {
+// 	refresh(frm) {
+
+// 	},
+// });
@@ -0,0 +1,143 @@
+# Copyright (c) 2025, Khalandar Sihan and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import flt, getdate, now
+
+from managefarmspro.managefarmspro.doctype.plot.plot import get_plot_doc
+from managefarmspro.utils.report_cache import clear_report_cache
+
+ROLLUP_KEY = ["work_date", "plot", "cluster", "customer", "work_item"]
+ROLLUP_COSTS = ["labor_cost", "material_cost", "equipment_cost", "supervision_cost", "total_cost"]
+
+
+class WorkCostDailyRollup(Document):
+	pass
+
+
+def on_doctype_update():
+	# One row per day, plot, cluster, customer and work item. Missing key parts are stored as
+	# empty strings rather than NULL so they still collide on this constraint.
+	frappe.db.add_unique("Work Cost Daily Rollup", ROLLUP_KEY, constraint_name="unique_rollup_key")
+
+	# The unique key leads with work_date; reports filtered to a plot, cluster or customer
+	# need their own index to avoid reading the whole date range
+	frappe.db.add_index("Work Cost Daily Rollup", ["plot", "work_date"], "plot_work_date_index")
+	frappe.db.add_index("Work Cost Daily Rollup", ["cluster", "work_date"], "cluster_work_date_index")
+	frappe.db.add_index("Work Cost Daily Rollup", ["customer", "work_date"], "customer_work_date_index")
+
+
+def record_work_in_rollup(work, sign=1):
+	"""Apply a submitted (sign=1) or cancelled (sign=-1) Work to its rollup row by delta"""
+	if not work.plot or not work.work_date:
+		return
+
+	key = {
+		"work_date": getdate(work.work_date),
+		"plot": work.plot,
+		"cluster": get_plot_doc(work.plot).cluster or "",
+		"customer": work.customer or "",
+		"work_item": work.work_name or "",
+	}
+	costs = {
+		"labor_cost": sign * flt(work.labor_cost),
+		"material_cost": sign * flt(work.material_cost),
+		"equipment_cost": sign * flt(work.equipment_cost),
+		"supervision_cost": sign * flt(work.supervision_amount),
+		"total_cost": sign * flt(work.total_cost),
+	}
+	timestamp = now()
+
+	frappe.db.sql(
+		"""
+		INSERT INTO `tabWork Cost Daily Rollup`
+			(name, work_date, plot, cluster, customer, work_item,
+			labor_cost, material_cost, equipment_cost, supervision_cost, total_cost, work_count,
+			creation, modified, owner, modified_by, docstatus, idx)
+		VALUES
+			(%(name)s, %(work_date)s, %(plot)s, %(cluster)s, %(customer)s, %(work_item)s,
+			%(labor_cost)s, %(material_cost)s, %(equipment_cost)s, %(supervision_cost)s, %(total_cost)s,
+			%(work_count)s, %(timestamp)s, %(timestamp)s, %(user)s, %(user)s, 0, 0)
+		ON DUPLICATE KEY UPDATE
+			labor_cost = labor_cost + VALUES(labor_cost),
+			material_cost = material_cost + VALUES(material_cost),
+			equipment_cost = equipment_cost + VALUES(equipment_cost),
+			supervision_cost = supervision_cost + VALUES(supervision_cost),
+			total_cost = total_cost + VALUES(total_cost),
+			work_count = work_count + VALUES(work_count),
+			modified = VALUES(modified),
+			modified_by = VALUES(modified_by)
+		""",
+		{
+			"name": frappe.generate_hash(length=10),
+			**key,
+			**costs,
+			"work_count": sign,
+			"timestamp": timestamp,
+			"user": frappe.session.user,
+		},
+	)
+
+	if sign < 0:
+		# Drop the row once its last work is cancelled so reports don't list empty groups
+		frappe.db.delete("Work Cost Daily Rollup", {**key, "work_count": ("<=", 0)})
+
+
+def rebuild_work_cost_rollup():
+	"""Recreate the whole rollup from submitted works"""
+	frappe.db.delete("Work Cost Daily Rollup")
+
+	rows = frappe.db.sql(
+		"""
+		SELECT
+			work_date, plot, cluster, customer, work_item,
+			SUM(labor_cost) AS labor_cost,
+			SUM(material_cost) AS material_cost,
+			SUM(equipment_cost) AS equipment_cost,
+			SUM(supervision_amount) AS supervision_cost,
+			SUM(total_cost) AS total_cost,
+			COUNT(*) AS work_count
+		FROM (
+			SELECT
+				w.work_date,
+				w.plot,
+				COALESCE(p.cluster, '') AS cluster,
+				COALESCE(w.customer, '') AS customer,
+				COALESCE(w.work_name, '') AS work_item,
+				COALESCE(w.labor_cost, 0) AS labor_cost,
+				COALESCE(w.material_cost, 0) AS material_cost,
+				COALESCE(w.equipment_cost, 0) AS equipment_cost,
+				COALESCE(w.supervision_amount, 0) AS supervision_amount,
+				COALESCE(w.total_cost, 0) AS total_cost
+			FROM `tabWork` w
+			LEFT JOIN `tabPlot` p ON p.name = w.plot
+			WHERE w.docstatus = 1 AND w.plot IS NOT NULL AND w.work_date IS NOT NULL
+		) works
+		GROUP BY work_date, plot, cluster, customer, work_item
+		""",
+		as_dict=True,
+	)
+
+	timestamp = now()
+	user = frappe.session.user
+	frappe.db.bulk_insert(
+		"Work Cost Daily Rollup",
+		fields=["name", *ROLLUP_KEY, *ROLLUP_COSTS, "work_count", "creation", "modified", "owner", "modified_by"],
+		values=[
+			(
+				frappe.generate_hash(length=10),
+				*(row[fieldname] for fieldname in ROLLUP_KEY),
+				*(row[fieldname] for fieldname in ROLLUP_COSTS),
+				row.work_count,
+				timestamp,
+				timestamp,
+				user,
+				user,
+			)
+			for row in rows
+		],
+	)
+	clear_report_cache()
+
+	return len(rows)
@@ -26,19 +26,126 @@ frappe.query_reports["Collated Plot Invoice"] = {
     },
   ],
   onload: function (report) {
+    setupInvoiceJobListeners();
+
     report.page.add_inner_button(__("Generate Invoice"), function () {
       const filters = report.get_values();
       frappe.call({
         method:
           "managefarmspro.managefarmspro.report.collated_plot_invoice.collated_plot_invoice.download_invoice_pdf",
-        args: { filters: filters },
+        args: { filters: filters, enqueue: 1 },
         callback: function (response) {
           if (response.message) {
-            window.open(response.message, "_blank");
-            frappe.msgprint(__("PDF generated and saved to File Manager."));
+            frappe.show_alert({
+              message: __("Invoice generation has been queued."),
+              indicator: "blue",
+            });
           }
         },
       });
     });
+
+    report.page.add_inner_button(__("Bulk Generate Invoices"), function () {
+      showBulkInvoiceDialog(report);
+    });
   },
 };
+
+function showBulkInvoiceDialog(report) {
+  const filters = report.get_values() || {};
+  const dialog = new frappe.ui.Dialog({
+    title: __("Bulk Generate Invoices"),
+    fields: [
+      {
+        fieldname: "start_date",
+        label: __("Start Date"),
+        fieldtype: "Date",
+        reqd: 1,
+        default: filters.start_date || frappe.datetime.month_start(),
+      },
+      {
+        fieldname: "end_date",
+        label: __("End Date"),
+        fieldtype: "Date",
+        reqd: 1,
+        default: filters.end_date || frappe.datetime.month_end(),
+      },
+      { fieldname: "cluster", label: __("Cluster"), fieldtype: "Link", options: "Cluster" },
+      {
+        fieldname: "plot_location",
+        label: __("Location"),
+        fieldtype: "Link",
+        options: "Plot Location",
+      },
+      { fieldname: "customer", label: __("Customer"), fieldtype: "Link", options: "Customer" },
+    ],
+    primary_action_label: __("Generate"),
+    primary_action: function (values) {
+      dialog.hide();
+      frappe.call({
+        method:
+          "managefarmspro.managefarmspro.report.collated_plot_invoice.collated_plot_invoice.bulk_generate_invoices",
+        args: values,
+        callback: function (response) {
+          if (response.message) {
+            frappe.show_alert({
+              message: __("Queued invoices for {0} plots.", [response.message.plots]),
+              indicator: "blue",
+            });
+          }
+        },
+      });
+    },
+  });
+  dialog.show();
+}
+
+function setupInvoiceJobListeners() {
+  // Remove any existing socket event listeners to prevent duplicates
+  frappe.realtime.off("collated_invoice_progress");
+  frappe.realtime.off("collated_invoice_generated");
+  frappe.realtime.off("collated_invoice_failed");
+  frappe.realtime.off("bulk_invoice_completed");
+
+  frappe.realtime.on("bulk_invoice_completed", function (data) {
+    frappe.msgprint({
+      title: __("Bulk Invoicing Completed"),
+      message: __("{0} plots invoiced, {1} skipped, {2} failed.", [
+        data.invoiced,
+        data.skipped,
+        data.failed,
+      ]),
+      indicator: data.failed ? "orange" : "green",
+    });
+    frappe.query_report.refresh();
+  });
+
+  frappe.realtime.on("collated_invoice_progress", function (data) {
+    frappe.show_progress(
+      __("Generating Invoice for {0}", [data.plot]),
+      data.progress,
+      100,
+      data.message
+    );
+  });
+
+  frappe.realtime.on("collated_invoice_generated", function (data) {
+    frappe.hide_progress();
+    if (data.file_url) {
+      window.open(data.file_url, "_blank");
+      frappe.msgprint(__("PDF generated and saved to File Manager."));
+    } else {
+      frappe.msgprint(__("No new work entries found for generating the invoice."));
+    }
+    frappe.query_report.refresh();
+  });
+
+  frappe.realtime.on("collated_invoice_failed", function (data) {
+    frappe.hide_progress();
+    frappe.msgprint({
+      title: __("Invoice generation failed for {0}", [data.plot]),
+      message: data.error,
+      indicator: "red",
+    });
+  });
+}
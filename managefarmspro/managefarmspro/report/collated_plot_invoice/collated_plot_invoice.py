@@ -7,11 +7,18 @@ import uuid
 import frappe
 from frappe import _
 from frappe.query_builder import DocType
-from frappe.utils import add_days
+from frappe.query_builder.functions import Coalesce
+from frappe.utils import add_days, cint, flt, get_url
 from frappe.utils.pdf import get_pdf
+from managefarmspro.utils.instrumentation import instrument
+from managefarmspro.utils.report_filters import PLOT_COLUMNS, compile_filters
+
+# Bulk invoicing run summaries are kept in the cache for a week
+BULK_INVOICE_RUN_EXPIRY = 7 * 24 * 60 * 60
 
 
 @frappe.whitelist()
+@instrument()
 def execute(filters=None):
 	"""Generate report data and return columns, data for Frappe query report."""
 	columns = get_columns()
@@ -31,8 +38,12 @@ def get_columns():
 	]
 
 
-def get_data(filters):
-	"""Fetch and structure data for the report based on the provided filters."""
+def get_data(filters, for_update=False):
+	"""Fetch and structure data for the report based on the provided filters.
+
+	With `for_update` the works are read with a locking read, which sees the latest committed
+	invoice numbers instead of the transaction's snapshot and holds the rows until commit.
+	"""
 	Work = DocType("Work")
 	Plot = DocType("Plot")
 
@@ -50,7 +61,7 @@ def get_data(filters):
 		conditions &= Work.work_date.between(start_date, end_date)
 
 	# Using Query Builder instead of raw SQL
-	invoices = (
+	query = (
 		frappe.qb.from_(Work)
 		.left_join(Plot)
 		.on(Work.plot == Plot.name)
@@ -63,104 +74,334 @@ def get_data(filters):
 			Work.description,
 			Work.total_cost,
 			Work.customer,
+			Plot.customer_name.as_("plot_customer"),
+			(Coalesce(Work.total_cost, 0) * Coalesce(Plot.supervision_charges, 0) / 100).as_(
+				"supervision_charge"
+			),
 		)
 		.where(conditions)
 		.orderby(Work.work_date)
-		.run(as_dict=True)
 	)
+	if for_update:
+		query = query.for_update()
+	invoices = query.run(as_dict=True)
+
+	items_by_work = get_invoice_items([invoice.work_id for invoice in invoices])
 
 	grand_total = 0
 	supervision_charges = 0
 	for invoice in invoices:
 		grand_total += invoice.get("total_cost", 0) or 0
 
-		plot_details = frappe.db.get_value(
-			"Plot", invoice.get("plot"), ["customer_name", "plot_name", "supervision_charges"], as_dict=True
-		)
-		invoice["customer"] = invoice.get("customer") or plot_details.get("customer_name", _("N/A"))
-		invoice["plot_name"] = plot_details.get("plot_name") if plot_details else _("N/A")
+		plot_customer = invoice.pop("plot_customer")
+		invoice["customer"] = invoice.get("customer") or plot_customer
+		invoice["plot_name"] = invoice.get("plot_name") or _("N/A")
+
+		supervision_charges += flt(invoice.pop("supervision_charge"))
 
-		supervision_percent = plot_details.get("supervision_charges") if plot_details else 0
-		invoice_supervision_charge = (supervision_percent / 100) * invoice.get("total_cost", 0)
-		supervision_charges += invoice_supervision_charge
+		invoice["items"] = items_by_work.get(invoice.work_id, [])
 
-		# Fetch item names from Item Doctype and include them
-		labor_details = frappe.get_all(
-			"Labor Child",
-			filters={"parent": invoice.get("work_id")},
+	return invoices, grand_total, supervision_charges
+
+
+def get_invoice_items(work_ids):
+	"""Fetch the labor, equipment and material lines of all works with one query per child table."""
+	items_by_work = {work_id: [] for work_id in work_ids}
+	if not work_ids:
+		return items_by_work
+
+	child_tables = [
+		("Labor Child", "labor", "Labor"),
+		("Equipment Child", "equipment", "Equipment"),
+		("Material Child", "material", "Raw Material"),
+	]
+
+	details_by_table = []
+	for child_doctype, prefix, item_group in child_tables:
+		details = frappe.get_all(
+			child_doctype,
+			filters={"parent": ["in", work_ids], "parenttype": "Work"},
 			fields=[
-				"labor_code as item_code",
+				"parent",
+				f"{prefix}_code as item_code",
 				"item_display_name as item_name",
-				"number_of_labor_units as qty",
-				"labor_unit as unit",
+				f"number_of_{prefix}_units as qty",
+				f"{prefix}_unit as unit",
 				"unit_price as rate",  # Include rate
 				"total_price as amount",
-				"'Labor' as item_group",
+				f"'{item_group}' as item_group",
 			],
 		)
-		equipment_details = frappe.get_all(
-			"Equipment Child",
-			filters={"parent": invoice.get("work_id")},
-			fields=[
-				"equipment_code as item_code",
-				"item_display_name as item_name",
-				"number_of_equipment_units as qty",
-				"equipment_unit as unit",
-				"unit_price as rate",  # Include rate
-				"total_price as amount",
-				"'Equipment' as item_group",
-			],
+		details_by_table.append(details)
+
+	# Map item codes to item names for rows without a display name, in one lookup
+	missing_item_codes = {
+		item.item_code for details in details_by_table for item in details if not item.get("item_name")
+	}
+	item_names = {}
+	if missing_item_codes:
+		item_names = dict(
+			frappe.get_all(
+				"Item",
+				filters={"name": ["in", list(missing_item_codes)]},
+				fields=["name", "item_name"],
+				as_list=True,
+			)
 		)
-		material_details = frappe.get_all(
-			"Material Child",
-			filters={"parent": invoice.get("work_id")},
-			fields=[
-				"material_code as item_code",
-				"item_display_name as item_name",
-				"number_of_material_units as qty",
-				"material_unit as unit",
-				"unit_price as rate",  # Include rate
-				"total_price as amount",
-				"'Raw Material' as item_group",
-			],
+
+	# Keep the labor, equipment, material order within each work
+	for details in details_by_table:
+		for item in details:
+			if not item.get("item_name"):
+				item["item_name"] = item_names.get(item["item_code"]) or item["item_code"]
+			items_by_work[item.pop("parent")].append(item)
+
+	return items_by_work
+
+
+@frappe.whitelist()
+@instrument()
+def download_invoice_pdf(filters, enqueue=0):
+	"""
+	Generate a consolidated Sales Invoice PDF, link the invoice number to each work entry,
+	and create a Sales Invoice entry in Frappe.
+
+	With `enqueue` set the invoice is generated in a background job and the job id is
+	returned straight away; progress and completion are published over realtime.
+	"""
+	if isinstance(filters, str):
+		filters = json.loads(filters)
+
+	base_url = get_request_base_url()
+
+	if cint(enqueue):
+		job_id = get_invoice_job_id(filters)
+		frappe.enqueue(
+			generate_invoice_job,
+			queue="long",
+			job_id=job_id,
+			deduplicate=True,
+			filters=filters,
+			base_url=base_url,
+			user=frappe.session.user,
 		)
+		return {"job_id": job_id}
 
-		# Map item codes to item names
-		# for item in labor_details + equipment_details + material_details:
-		# 	item["item_name"] = (
-		# 		frappe.db.get_value("Item", item["item_code"], "item_name") or item["item_code"]
-		# 	)
+	return generate_collated_invoice(filters, base_url)["file_url"]
 
-		# Map item codes to item names
-		for item in labor_details + equipment_details + material_details:
-			if not item.get("item_name") or item["item_name"] == "":
-				item["item_name"] = (
-					frappe.db.get_value("Item", item["item_code"], "item_name") or item["item_code"]
-				)
 
+def get_request_base_url():
+	"""Return the URL the client used, falling back to the site URL outside a request."""
+	request = frappe.request
+	if not request:
+		return get_url()
 
-		# Combine the details into one list of items
-		invoice["items"] = labor_details + equipment_details + material_details
+	# Get the host from the request headers
+	host = request.headers.get("Host")
 
-		# Ensure items are initialized
-		invoice["items"] = invoice["items"] if invoice["items"] else []
+	# Get the scheme (http/https)
+	forwarded_proto = request.headers.get("X-Forwarded-Proto", "http")
 
-	return invoices, grand_total, supervision_charges
+	# If we're behind a proxy (like nginx), use the original host
+	original_host = request.headers.get("X-Forwarded-Host", host)
+
+	# Construct the base URL using the actual host that the client used
+	return f"{forwarded_proto}://{original_host}"
+
+
+def get_invoice_job_id(filters):
+	"""One job per plot and period, so a second click or a retry does not queue a duplicate."""
+	return f"collated_invoice::{filters.get('plot')}::{filters.get('start_date')}::{filters.get('end_date')}"
+
+
+def generate_invoice_job(filters, base_url, user, notify_user=True):
+	"""Background job for download_invoice_pdf.
+
+	The plot row is locked and the uninvoiced works are re-read with a locking read, so a
+	retried or concurrent job only invoices works that no other job has linked to a Sales
+	Invoice, even when that job committed after this transaction's snapshot was taken.
+	"""
+	job_id = get_invoice_job_id(filters)
+
+	def notify(event, message, after_commit=False):
+		if notify_user:
+			message.update({"job_id": job_id, "plot": filters.get("plot")})
+			frappe.publish_realtime(event, message, user=user, after_commit=after_commit)
+
+	def progress(percent, message):
+		notify("collated_invoice_progress", {"progress": percent, "message": message})
+
+	progress(0, _("Collecting works"))
+	frappe.db.sql("SELECT name FROM `tabPlot` WHERE name = %s FOR UPDATE", filters.get("plot"))
+
+	data = get_data(filters, for_update=True)
+	if not data[0]:
+		# Nothing left to invoice, e.g. a retry after the first attempt committed
+		notify("collated_invoice_generated", {"file_url": None}, after_commit=True)
+		return
+
+	try:
+		result = generate_collated_invoice(filters, base_url, progress, data=data)
+	except Exception as e:
+		notify("collated_invoice_failed", {"error": str(e)})
+		raise
+
+	for work_id in result["works"]:
+		frappe.publish_realtime(
+			"pdf_generated",
+			{"doc_name": work_id, "invoice_number": result["invoice_number"]},
+			doctype="Work",
+			docname=work_id,
+			after_commit=True,
+		)
+
+	notify("collated_invoice_generated", dict(result), after_commit=True)
+	progress(100, _("Invoice {0} generated").format(result["invoice_number"]))
+
+	return result
 
 
 @frappe.whitelist()
-def download_invoice_pdf(filters):
+@instrument()
+def bulk_generate_invoices(start_date, end_date, cluster=None, plot_location=None, customer=None):
 	"""
-	Generate a consolidated Sales Invoice PDF, link the invoice number to each work entry,
-	and create a Sales Invoice entry in Frappe.
+	Queue one invoice job per plot that has uninvoiced submitted works in the period.
+
+	Jobs run in parallel on the long queue workers and a failing plot does not affect the
+	others. Returns a run id whose summary is available from get_bulk_invoice_summary.
 	"""
-	if isinstance(filters, str):
-		filters = json.loads(filters)
+	frappe.has_permission("Sales Invoice", "create", throw=True)
+
+	plots = get_plots_to_invoice(start_date, end_date, cluster, plot_location, customer)
+	run_id = frappe.generate_hash(length=10)
+	run_key = get_bulk_invoice_run_key(run_id)
+	base_url = get_request_base_url()
+
+	for plot in plots:
+		frappe.cache.hset(run_key, plot.plot, {"status": "Queued", "works": plot.works})
+	frappe.cache.expire(frappe.cache.make_key(run_key), BULK_INVOICE_RUN_EXPIRY)
+
+	# Each plot job counts this down; the one that reaches zero announces the end of the run
+	frappe.cache.set(get_bulk_invoice_remaining_key(run_id), len(plots), ex=BULK_INVOICE_RUN_EXPIRY)
+
+	for plot in plots:
+		filters = {"plot": plot.plot, "start_date": start_date, "end_date": end_date}
+		frappe.enqueue(
+			bulk_invoice_plot_job,
+			queue="long",
+			# Scoped to the run, so a pending single-plot job for the same period can't swallow it
+			job_id=get_bulk_invoice_job_id(run_id, plot.plot),
+			deduplicate=True,
+			enqueue_after_commit=True,
+			run_id=run_id,
+			filters=filters,
+			base_url=base_url,
+			user=frappe.session.user,
+		)
+
+	return {"run_id": run_id, "plots": len(plots)}
+
+
+def get_bulk_invoice_run_key(run_id):
+	return f"collated_invoice_run:{run_id}"
+
+
+def get_bulk_invoice_remaining_key(run_id):
+	# Read and written with raw redis commands, so the key is made site-specific here
+	return frappe.cache.make_key(f"collated_invoice_run_remaining:{run_id}")
+
+
+def get_bulk_invoice_job_id(run_id, plot):
+	return f"collated_invoice_run::{run_id}::{plot}"
+
+
+def get_plots_to_invoice(start_date, end_date, cluster=None, plot_location=None, customer=None):
+	"""Plots with uninvoiced submitted works in the period, with one grouped query."""
+	conditions, values = compile_filters(
+		{"cluster": cluster, "plot_location": plot_location, "customer": customer}, PLOT_COLUMNS, alias="p"
+	)
+	values.update({"start_date": start_date, "end_date": end_date})
+
+	return frappe.db.sql(
+		"""
+		SELECT w.plot, COUNT(*) AS works
+		FROM `tabWork` w
+		INNER JOIN `tabPlot` p ON p.name = w.plot
+		WHERE w.docstatus = 1
+		AND (w.invoice_number IS NULL OR w.invoice_number = '')
+		AND w.work_date BETWEEN %(start_date)s AND %(end_date)s
+		{conditions}
+		GROUP BY w.plot
+		ORDER BY w.plot
+		""".format(conditions="".join(f" AND {condition}" for condition in conditions)),
+		values,
+		as_dict=True,
+	)
+
+
+def bulk_invoice_plot_job(run_id, filters, base_url, user):
+	"""Invoice one plot of a bulk run, recording the outcome instead of failing the run."""
+	run_key = get_bulk_invoice_run_key(run_id)
+	plot = filters.get("plot")
+	outcome = frappe.cache.hget(run_key, plot) or {}
+
+	try:
+		result = generate_invoice_job(filters, base_url, user, notify_user=False)
+		frappe.db.commit()
+	except Exception as e:
+		frappe.db.rollback()
+		frappe.log_error(f"Bulk invoice run {run_id} failed for Plot {plot}", "Bulk Invoice Error")
+		outcome.update({"status": "Failed", "error": str(e)})
+	else:
+		if result:
+			outcome.update(
+				{"status": "Invoiced", "invoice_number": result["invoice_number"], "file_url": result["file_url"]}
+			)
+		else:
+			outcome.update({"status": "Skipped"})
+
+	frappe.cache.hset(run_key, plot, outcome)
 
-	invoices, grand_total, supervision_charges = get_data(filters)
+	# decr is atomic, so exactly one job of the run sees the count reach zero
+	if frappe.cache.decr(get_bulk_invoice_remaining_key(run_id)) == 0:
+		frappe.publish_realtime("bulk_invoice_completed", get_bulk_invoice_summary(run_id), user=user)
+
+
+@frappe.whitelist()
+@instrument()
+def get_bulk_invoice_summary(run_id):
+	"""Per-plot outcome and status counts of a bulk invoicing run."""
+	# hgetall returns the plot names as bytes, which can't be serialised to JSON
+	plots = {
+		frappe.safe_decode(plot): outcome
+		for plot, outcome in (frappe.cache.hgetall(get_bulk_invoice_run_key(run_id)) or {}).items()
+	}
+
+	counts = {"Queued": 0, "Invoiced": 0, "Skipped": 0, "Failed": 0}
+	for outcome in plots.values():
+		counts[outcome.get("status")] = counts.get(outcome.get("status"), 0) + 1
+
+	return {
+		"run_id": run_id,
+		"total": len(plots),
+		"pending": counts["Queued"],
+		"invoiced": counts["Invoiced"],
+		"skipped": counts["Skipped"],
+		"failed": counts["Failed"],
+		"plots": plots,
+	}
+
+
+def generate_collated_invoice(filters, base_url, progress=None, data=None):
+	"""Create and submit the Sales Invoice, render and store its PDF and link it to the works."""
+	progress = progress or (lambda percent, message: None)
+
+	invoices, grand_total, supervision_charges = data or get_data(filters)
 	if not invoices:
 		frappe.throw(_("No new work entries found for generating the invoice."))
 
+	progress(20, _("Creating Sales Invoice"))
+
 	final_grand_total = grand_total + supervision_charges
 
 	customer = invoices[0].get("customer", None)
@@ -238,6 +479,8 @@ def download_invoice_pdf(filters):
 	for invoice in invoices:
 		frappe.db.set_value("Work", invoice["work_id"], "invoice_number", invoice_number)
 
+	progress(50, _("Rendering PDF"))
+
 	for invoice in invoices:
 		invoice["invoice_items"] = invoice.pop("items", []) if invoice.get("items") is not None else []
 
@@ -255,20 +498,7 @@ def download_invoice_pdf(filters):
 	html = frappe.render_template("managefarmspro/templates/collated_invoice.html", context)
 	pdf_file = get_pdf(html)
 
-	# Get the request object to access headers
-	request = frappe.request
-
-	# Get the host from the request headers
-	host = request.headers.get("Host")
-
-	# Get the scheme (http/https)
-	forwarded_proto = request.headers.get("X-Forwarded-Proto", "http")
-
-	# If we're behind a proxy (like nginx), use the original host
-	original_host = request.headers.get("X-Forwarded-Host", host)
-
-	# Construct the base URL using the actual host that the client used
-	base_url = f"{forwarded_proto}://{original_host}"
+	progress(80, _("Saving PDF"))
 
 	# Retrieve the plot ID from the provided filters
 	plot_id = filters.get("plot")
@@ -324,4 +554,8 @@ def download_invoice_pdf(filters):
 	for invoice in invoices:
 		frappe.db.set_value("Work", invoice["work_id"], "pdf_invoice_link", final_file_path)
 
-	return final_url
+	return {
+		"invoice_number": invoice_number,
+		"file_url": final_url,
+		"works": [invoice["work_id"] for invoice in invoices],
+	}
@@ -3,9 +3,11 @@
 
 import frappe
 from frappe import _
-from frappe.utils import flt
+from frappe.utils import flt, get_first_day, getdate
+from managefarmspro.utils.instrumentation import instrument
 
 
+@instrument()
 def execute(filters=None):
 	if filters is None:
 		filters = {}
@@ -38,7 +40,6 @@ def get_columns():
 			"options": "Cluster",
 			"width": 120,
 		},
-		{"fieldname": "plot_status", "label": _("Status"), "fieldtype": "Select", "width": 100},
 		{
 			"fieldname": "monthly_maintenance_budget",
 			"label": _("Monthly Budget"),
@@ -56,23 +57,39 @@ def get_columns():
 
 
 def get_data(threshold):
-	# Updated query to calculate balance correctly
+	"""Plots whose balance for the current month is at or below the threshold.
+
+	Spending is read live from this month's Plot Monthly Spend row, found through its unique
+	(plot, month_start) key, rather than from the stored total_amount_spent, which may predate
+	the latest works.
+	"""
 	query = """
-        SELECT
-            plot_name,
-            customer_name,
-            cluster,
-            plot_status,
-            monthly_maintenance_budget,
-            total_amount_spent,
-            (monthly_maintenance_budget - IFNULL(total_amount_spent, 0)) as maintenance_balance
-        FROM `tabPlot`
-        WHERE monthly_maintenance_budget > 0
-        AND (monthly_maintenance_budget - IFNULL(total_amount_spent, 0)) <= %s
-        ORDER BY maintenance_balance ASC, plot_name ASC
-    """
+		SELECT
+			plot_name,
+			customer_name,
+			cluster,
+			monthly_maintenance_budget,
+			total_amount_spent,
+			monthly_maintenance_budget - total_amount_spent AS maintenance_balance
+		FROM (
+			SELECT
+				p.plot_name,
+				p.customer_name,
+				p.cluster,
+				p.monthly_maintenance_budget,
+				COALESCE(s.total_cost, 0) * (1 + COALESCE(p.supervision_charges, 0) / 100) AS total_amount_spent
+			FROM `tabPlot` p
+			LEFT JOIN `tabPlot Monthly Spend` s
+				ON s.plot = p.name AND s.month_start = %(month_start)s
+			WHERE p.monthly_maintenance_budget > 0
+		) plots
+		WHERE monthly_maintenance_budget - total_amount_spent <= %(threshold)s
+		ORDER BY maintenance_balance ASC, plot_name ASC
+	"""
 
-	result = frappe.db.sql(query, (threshold,), as_dict=1)
+	result = frappe.db.sql(
+		query, {"month_start": get_first_day(getdate()), "threshold": threshold}, as_dict=1
+	)
 
 	# Ensure proper number formatting
 	for row in result:
@@ -13,7 +13,7 @@ frappe.query_reports["Maintenance Balance Status"] = {
         if (!cluster) {
           frappe.query_report.set_filter_value("plot_location", "");
         }
-        frappe.query_report.refresh();
+        restartStatusPaging();
       },
     },
     {
@@ -21,6 +21,7 @@ frappe.query_reports["Maintenance Balance Status"] = {
       label: __("Location"),
       fieldtype: "Link",
       options: "Plot Location",
+      on_change: restartStatusPaging,
       get_query: function () {
         let cluster = frappe.query_report.get_filter_value("cluster");
         if (cluster) {
@@ -37,6 +38,7 @@ frappe.query_reports["Maintenance Balance Status"] = {
       label: __("Customer"),
       fieldtype: "Link",
       options: "Customer",
+      on_change: restartStatusPaging,
     },
     {
       fieldname: "balance_threshold",
@@ -44,6 +46,7 @@ frappe.query_reports["Maintenance Balance Status"] = {
       fieldtype: "Percent",
       default: 20,
       description: __("Balance percentage below which to show warning"),
+      on_change: restartStatusPaging,
     },
     {
       fieldname: "sort_by",
@@ -52,6 +55,21 @@ frappe.query_reports["Maintenance Balance Status"] = {
       options:
         "Balance %: Low to High\nBalance %: High to Low\nCluster\nCustomer\nLocation",
       default: "Balance %: Low to High",
+      on_change: restartStatusPaging,
+    },
+    {
+      fieldname: "page_length",
+      label: __("Plots per Page"),
+      fieldtype: "Int",
+      default: 100,
+      on_change: restartStatusPaging,
+    },
+    {
+      fieldname: "start",
+      label: __("Start"),
+      fieldtype: "Int",
+      default: 0,
+      hidden: 1,
     },
   ],
 
@@ -128,6 +146,14 @@ frappe.query_reports["Maintenance Balance Status"] = {
       showRiskAssessment(report);
     });
 
+    report.page.add_inner_button(__("Previous Page"), function () {
+      showStatusPage(-1);
+    });
+
+    report.page.add_inner_button(__("Next Page"), function () {
+      showStatusPage(1);
+    });
+
     // Hide the Actions button
     setTimeout(function () {
       // Try multiple selectors to catch the Actions button
@@ -147,6 +173,37 @@ frappe.query_reports["Maintenance Balance Status"] = {
   },
 };
 
+// Offset pagination: move `direction` pages from the current one
+function showStatusPage(direction) {
+  let report = frappe.query_report;
+  let page_length = cint(report.get_filter_value("page_length"));
+  if (!page_length) {
+    frappe.msgprint(__("All plots are shown on one page"));
+    return;
+  }
+
+  let start = cint(report.get_filter_value("start"));
+  if (direction > 0 && (report.data || []).length < page_length) {
+    frappe.msgprint(__("No more plots to show"));
+    return;
+  }
+  if (direction < 0 && !start) {
+    frappe.msgprint(__("Already on the first page"));
+    return;
+  }
+
+  report.set_filter_value("start", Math.max(start + direction * page_length, 0));
+}
+
+// Filter changes start again from the first page
+function restartStatusPaging() {
+  if (cint(frappe.query_report.get_filter_value("start"))) {
+    frappe.query_report.set_filter_value("start", 0);
+  } else {
+    frappe.query_report.refresh();
+  }
+}
+
 // Function to show data as a color-coded heatmap
 function showHeatmap(report) {
   if (!report.data || !report.data.length) {
@@ -4,8 +4,12 @@
 from __future__ import unicode_literals
 import frappe
 from frappe import _
-from frappe.utils import flt, getdate, nowdate, add_days, add_months
+from frappe.utils import flt, cint, getdate, nowdate, add_days, add_months
+from managefarmspro.utils.instrumentation import instrument
+from managefarmspro.utils.report_cache import get_cached_report
+from managefarmspro.utils.report_filters import PLOT_COLUMNS, compile_filters
 
+@instrument()
 def execute(filters=None):
     if not filters:
         filters = {}
@@ -14,11 +18,16 @@ def execute(filters=None):
     if not filters.get("balance_threshold"):
         filters["balance_threshold"] = 20
     
+    # Dashboards refresh this report often with the same filters, so serve it from the report cache
+    return get_cached_report("Maintenance Balance Status", filters, lambda: get_report_result(filters))
+
+def get_report_result(filters):
     columns = get_columns()
     data = get_data(filters)
     
-    # Prepare chart data
-    chart = get_chart(data)
+    # data may be a single page, so the chart counts every matching plot from the aggregate
+    totals = get_maintenance_status_totals(filters)
+    chart = get_chart(totals) if totals["plots"]["total"] else None
     
     return columns, data, None, chart
 
@@ -91,29 +100,32 @@ def get_columns():
         }
     ]
 
+# SQL ORDER BY for each sort_by option, with the plot name as tie breaker so pages are stable
+SORT_ORDERS = {
+    "Balance %: Low to High": "balance_percentage ASC, p.name ASC",
+    "Balance %: High to Low": "balance_percentage DESC, p.name ASC",
+    "Cluster": "p.cluster ASC, p.name ASC",
+    "Customer": "p.customer_name ASC, p.name ASC",
+    "Location": "p.plot_location ASC, p.name ASC",
+}
+
 def get_data(filters):
-    """Fetch and process data for the report"""
-    # Build conditions based on filters
-    conditions = []
-    
-    if filters.get("cluster"):
-        conditions.append(f"p.cluster = '{filters.get('cluster')}'")
-    
-    if filters.get("plot_location"):
-        conditions.append(f"p.plot_location = '{filters.get('plot_location')}'")
+    """Fetch and process data for the report
     
-    if filters.get("customer"):
-        conditions.append(f"p.customer_name = '{filters.get('customer')}'")
+    Rows are sorted in SQL according to sort_by. Pass page_length (and optionally start)
+    in the filters to fetch a single page.
+    """
+    conditions, values = get_conditions(filters)
+    order_by = SORT_ORDERS.get(filters.get("sort_by", "Balance %: Low to High"), "p.name ASC")
     
-    # Combine all conditions with AND
-    where_clause = " AND ".join(conditions)
-    if where_clause:
-        where_clause = "WHERE " + where_clause
-    else:
-        where_clause = "WHERE 1=1"  # Always true condition if no filters
+    limit = ""
+    if cint(filters.get("page_length")):
+        limit = "LIMIT %(page_length)s OFFSET %(start)s"
+        values["page_length"] = cint(filters.get("page_length"))
+        values["start"] = cint(filters.get("start"))
     
-    # Get plot data with maintenance budget info
-    plots_query = f"""
+    # Get plot data with maintenance budget info; last activity is maintained on the Plot
+    plots = frappe.db.sql(f"""
         SELECT 
             p.name as plot_name,
             p.cluster,
@@ -122,31 +134,24 @@ def get_data(filters):
             p.monthly_maintenance_budget,
             COALESCE(p.total_amount_spent, 0) as total_spent,
             COALESCE(p.maintenance_balance, p.monthly_maintenance_budget) as maintenance_balance,
-            (
-                SELECT MAX(w.work_date) 
-                FROM `tabWork` w 
-                WHERE w.plot = p.name AND w.docstatus = 1
-            ) as last_activity
+            ROUND(
+                COALESCE(p.maintenance_balance, p.monthly_maintenance_budget) / p.monthly_maintenance_budget * 100, 2
+            ) as balance_percentage,
+            p.last_activity_date as last_activity
         FROM 
             `tabPlot` p
-        {where_clause}
-        AND p.monthly_maintenance_budget > 0
-    """
+        WHERE
+            {conditions}
+        ORDER BY
+            {order_by}
+        {limit}
+    """, values, as_dict=1)
     
-    plots = frappe.db.sql(plots_query, as_dict=1)
-    
-    # Process data to add balance percentage and status
-    result = []
+    # Add status to each row
     warning_threshold = flt(filters.get("balance_threshold"))
     
     for plot in plots:
-        # Calculate balance percentage
-        if plot.monthly_maintenance_budget > 0:
-            balance_percentage = (plot.maintenance_balance / plot.monthly_maintenance_budget) * 100
-        else:
-            balance_percentage = 0
-        
-        plot.balance_percentage = flt(balance_percentage, 2)
+        plot.balance_percentage = flt(plot.balance_percentage, 2)
         
         # Set warning threshold for each row for the formatter
         plot.warning_threshold = warning_threshold
@@ -158,34 +163,19 @@ def get_data(filters):
             plot.status = "Warning"
         else:
             plot.status = "Good"
-        
-        result.append(plot)
-    
-    # Sort data based on the selected option
-    sort_option = filters.get("sort_by", "Balance %: Low to High")
-    
-    if sort_option == "Balance %: Low to High":
-        result = sorted(result, key=lambda x: x.balance_percentage)
-    elif sort_option == "Balance %: High to Low":
-        result = sorted(result, key=lambda x: x.balance_percentage, reverse=True)
-    elif sort_option == "Cluster":
-        result = sorted(result, key=lambda x: x.cluster or "")
-    elif sort_option == "Customer":
-        result = sorted(result, key=lambda x: x.customer_name or "")
-    elif sort_option == "Location":
-        result = sorted(result, key=lambda x: x.plot_location or "")
-    
-    return result
-
-def get_chart(data):
-    """Generate chart data for the report"""
-    if not data:
-        return None
     
-    # Count plots in each status category
-    deficit_count = sum(1 for d in data if d.status == "Deficit")
-    warning_count = sum(1 for d in data if d.status == "Warning")
-    good_count = sum(1 for d in data if d.status == "Good")
+    return plots
+
+def get_conditions(filters):
+    """Build the WHERE clause and its values for the budgeted plots matching the filters"""
+    conditions, values = compile_filters(filters, PLOT_COLUMNS, alias="p")
+    return " AND ".join(["p.monthly_maintenance_budget > 0", *conditions]), values
+
+def get_chart(totals):
+    """Generate chart data for the report from get_maintenance_status_totals"""
+    deficit_count = totals["plots"]["deficit"]
+    warning_count = totals["plots"]["warning"]
+    good_count = totals["plots"]["good"]
     
     # Create a pie chart showing the distribution
     chart = {
@@ -205,8 +195,13 @@ def get_chart(data):
     return chart
 
 @frappe.whitelist()
-def get_maintenance_status_data(cluster=None, location=None, customer=None, threshold=20):
-    """API endpoint to get maintenance status data for dashboards"""
+@instrument()
+def get_maintenance_status_data(cluster=None, location=None, customer=None, threshold=20, summary_only=0):
+    """API endpoint to get maintenance status data for dashboards
+    
+    With summary_only set, only the status counts and budget totals are returned,
+    computed in a single aggregate query without the per-plot rows.
+    """
     filters = {
         "balance_threshold": threshold
     }
@@ -220,6 +215,65 @@ def get_maintenance_status_data(cluster=None, location=None, customer=None, thre
     if customer:
         filters["customer"] = customer
     
+    if cint(summary_only):
+        return get_cached_report(
+            "Maintenance Balance Status Counts", filters, lambda: get_maintenance_status_totals(filters)
+        )
+    
+    return get_cached_report(
+        "Maintenance Balance Status Summary", filters, lambda: get_maintenance_status_summary(filters)
+    )
+
+def get_maintenance_status_totals(filters):
+    """Status counts and budget totals, classified the same way as get_data, in one query"""
+    conditions, values = get_conditions(filters)
+    values["balance_threshold"] = flt(filters.get("balance_threshold"))
+    
+    totals = frappe.db.sql(f"""
+        SELECT
+            COUNT(*) as total,
+            COALESCE(SUM(CASE WHEN balance_percentage < 0 THEN 1 ELSE 0 END), 0) as deficit,
+            COALESCE(SUM(CASE WHEN balance_percentage >= 0 AND balance_percentage < %(balance_threshold)s
+                THEN 1 ELSE 0 END), 0) as warning,
+            COALESCE(SUM(CASE WHEN balance_percentage >= 0 AND balance_percentage >= %(balance_threshold)s
+                THEN 1 ELSE 0 END), 0) as good,
+            COALESCE(SUM(monthly_maintenance_budget), 0) as total_budget,
+            COALESCE(SUM(total_spent), 0) as total_spent,
+            COALESCE(SUM(maintenance_balance), 0) as total_balance
+        FROM (
+            SELECT
+                p.monthly_maintenance_budget,
+                COALESCE(p.total_amount_spent, 0) as total_spent,
+                COALESCE(p.maintenance_balance, p.monthly_maintenance_budget) as maintenance_balance,
+                ROUND(
+                    COALESCE(p.maintenance_balance, p.monthly_maintenance_budget) / p.monthly_maintenance_budget * 100, 2
+                ) as balance_percentage
+            FROM
+                `tabPlot` p
+            WHERE
+                {conditions}
+        ) plots
+    """, values, as_dict=1)[0]
+    
+    total_budget = flt(totals.total_budget)
+    total_balance = flt(totals.total_balance)
+    
+    return {
+        "plots": {
+            "total": cint(totals.total),
+            "deficit": cint(totals.deficit),
+            "warning": cint(totals.warning),
+            "good": cint(totals.good)
+        },
+        "budget": {
+            "total": total_budget,
+            "spent": flt(totals.total_spent),
+            "balance": total_balance,
+            "balance_percentage": (total_balance / total_budget * 100) if total_budget > 0 else 0
+        }
+    }
+
+def get_maintenance_status_summary(filters):
     data = get_data(filters)
     
     # Prepare summary statistics
@@ -5,8 +5,11 @@
 import frappe  
 import json  
 from frappe import _  
-from frappe.utils import getdate, add_months, month_diff, nowdate, get_first_day, get_last_day
+from frappe.utils import getdate, add_months, month_diff, nowdate, get_first_day, get_last_day, flt, cint
+from managefarmspro.utils.instrumentation import instrument
+from managefarmspro.utils.report_filters import ROLLUP_COLUMNS, compile_filters
 
+@instrument()
 def execute(filters=None):  
    if not filters:  
        filters = {}
@@ -73,126 +76,50 @@ def get_columns():
        }  
    ]
 
-def get_data(filters):  
-   """Fetch and process data for the report"""  
-   # Base query conditions - will be prefixed with table alias later  
-   conditions = " AND w.docstatus = 1"  # Only consider submitted works  
-    
-   # Add date range conditions  
-   conditions += f" AND w.work_date >= '{filters.get('from_date')}'"  
-   conditions += f" AND w.work_date <= '{filters.get('to_date')}'"  
-    
-   # Always join with Plot table for supervision charges and other filters
-   cluster_join = "LEFT JOIN `tabPlot` p ON w.plot = p.name"
-   
-   # Add filters sequentially instead of using elif to allow multiple filters to apply
-   if filters.get("cluster"):  
-       conditions += f" AND p.cluster = '{filters.get('cluster')}'"  
-   
-   if filters.get("plot"):  
-       conditions += f" AND w.plot = '{filters.get('plot')}'"  
-   
-   if filters.get("customer"):  
-       conditions += f" AND w.customer = '{filters.get('customer')}'"  
-    
-   # Query to get all relevant works with appropriate supervision charges  
-   query = f"""  
-       SELECT  
-           w.name,  
-           w.work_date,  
-           w.plot,  
-           w.total_cost,  
-           COALESCE(w.supervision_charges, p.supervision_charges, 0) as supervision_charges  
-       FROM  
-           `tabWork` w  
-       {cluster_join}  
-       WHERE  
-           1=1 {conditions}  
-       ORDER BY  
-           w.work_date  
-   """  
-    
-   works = frappe.db.sql(query, as_dict=1)  
-    
-   # Get additional cost breakdowns per work  
-   monthly_data = {}  
-   for work in works:  
-       # Format the month and year (e.g., "Jan 2025")  
-       month_year = getdate(work.work_date).strftime("%b %Y")  
-        
-       # Debug log for supervision_charges  
-       frappe.logger().debug(f"Work {work.name}, Date {work.work_date}, Supervision: {work.supervision_charges}")  
-        
-       # Initialize the month if not already in dictionary  
-       if month_year not in monthly_data:  
-           monthly_data[month_year] = {  
-               "month_year": month_year,  
-               "total_cost": 0,  
-               "labor_cost": 0,  
-               "material_cost": 0,  
-               "equipment_cost": 0,  
-               "supervision_cost": 0,  
-               "work_count": 0,  
-               "sort_key": getdate(work.work_date)  
-           }  
-        
-       # Get cost breakdown for this work  
-       labor_cost, material_cost, equipment_cost = get_cost_breakdown(work.name)  
-        
-       # Calculate supervision cost  
-       # Convert supervision_charges to float, ensure it defaults to 0 if None or invalid  
-       try:  
-           supervision_percentage = float(work.supervision_charges or 0)  
-       except (ValueError, TypeError):  
-           supervision_percentage = 0  
-            
-       # Calculate supervision cost based on total_cost  
-       supervision_cost = (work.total_cost * supervision_percentage) / 100  
-        
-       # Round supervision cost to 2 decimal places  
-       supervision_cost = round(supervision_cost, 2)  
-        
-       # Add to monthly totals  
-       monthly_data[month_year]["total_cost"] += work.total_cost  
-       monthly_data[month_year]["labor_cost"] += labor_cost  
-       monthly_data[month_year]["material_cost"] += material_cost  
-       monthly_data[month_year]["equipment_cost"] += equipment_cost  
-       monthly_data[month_year]["supervision_cost"] += supervision_cost  
-       monthly_data[month_year]["work_count"] += 1  
-    
-   # Convert dictionary to list and sort by date  
-   result = list(monthly_data.values())  
-   result.sort(key=lambda x: x["sort_key"])  
-    
-   # Remove the sort key from the final output  
-   for entry in result:  
-       del entry["sort_key"]  
-    
-   return result
+def get_data(filters):
+   """Fetch and process data for the report"""
+   conditions, values = compile_filters(filters, ROLLUP_COLUMNS, date_column="work_date")
 
+   # Bucket the daily rollup by month in the database, so only one row per month comes
+   # back and the raw works and their child rows are never scanned
+   months = frappe.db.sql(f"""
+       SELECT
+           YEAR(work_date) as year,
+           MONTH(work_date) as month,
+           SUM(total_cost) as total_cost,
+           SUM(labor_cost) as labor_cost,
+           SUM(material_cost) as material_cost,
+           SUM(equipment_cost) as equipment_cost,
+           SUM(supervision_cost) as supervision_cost,
+           SUM(work_count) as work_count
+       FROM
+           `tabWork Cost Daily Rollup`
+       WHERE
+           {" AND ".join(conditions) or "1 = 1"}
+       GROUP BY
+           year, month
+   """, values, as_dict=1)
 
+   totals_by_month = {(row.year, row.month): row for row in months}
 
-def get_cost_breakdown(work_name):
-    """Get the cost breakdown for a specific work"""
-    labor_cost = frappe.db.sql("""
-        SELECT COALESCE(SUM(total_price), 0) as cost
-        FROM `tabLabor Child`
-        WHERE parent = %s
-    """, work_name, as_dict=1)[0].cost
-    
-    material_cost = frappe.db.sql("""
-        SELECT COALESCE(SUM(total_price), 0) as cost
-        FROM `tabMaterial Child`
-        WHERE parent = %s
-    """, work_name, as_dict=1)[0].cost
-    
-    equipment_cost = frappe.db.sql("""
-        SELECT COALESCE(SUM(total_price), 0) as cost
-        FROM `tabEquipment Child`
-        WHERE parent = %s
-    """, work_name, as_dict=1)[0].cost
-    
-    return labor_cost, material_cost, equipment_cost
+   # One row per month in the range, with zeros for months without works
+   result = []
+   month_start = get_first_day(filters.get("from_date"))
+   last_month_start = get_first_day(filters.get("to_date"))
+   while month_start <= last_month_start:
+       totals = totals_by_month.get((month_start.year, month_start.month), {})
+       result.append({
+           "month_year": month_start.strftime("%b %Y"),
+           "total_cost": flt(totals.get("total_cost")),
+           "labor_cost": flt(totals.get("labor_cost")),
+           "material_cost": flt(totals.get("material_cost")),
+           "equipment_cost": flt(totals.get("equipment_cost")),
+           "supervision_cost": flt(totals.get("supervision_cost")),
+           "work_count": cint(totals.get("work_count"))
+       })
+       month_start = add_months(month_start, 1)
+
+   return result
 
 def get_chart(data):
     """Generate chart data for the report"""
@@ -232,6 +159,7 @@ def get_chart(data):
     return chart
 
 @frappe.whitelist()
+@instrument()
 def get_customer_for_plot(doctype, txt, searchfield, start, page_len, filters):
     """
     Get the customer for a specific plot.
@@ -261,6 +189,7 @@ def get_customer_for_plot(doctype, txt, searchfield, start, page_len, filters):
     return [(plot_info.customer_name,)]
 
 @frappe.whitelist()
+@instrument()
 def get_customers_for_cluster(doctype, txt, searchfield, start, page_len, filters):
    """
    Get all customers associated with plots in a specific cluster.
@@ -9,6 +9,7 @@ frappe.query_reports["Plot Budget Comparison"] = {
       fieldtype: "Link",
       options: "Cluster",
       width: "80",
+      on_change: restartPaging,
     },
     {
       fieldname: "plot_location",
@@ -16,6 +17,7 @@ frappe.query_reports["Plot Budget Comparison"] = {
       fieldtype: "Link",
       options: "Plot Location",
       width: "80",
+      on_change: restartPaging,
     },
     {
       fieldname: "limit",
@@ -34,6 +36,19 @@ frappe.query_reports["Plot Budget Comparison"] = {
         "Budget: High to Low\nBudget: Low to High\nSpent: High to Low\nSpent: Low to High\nBalance: High to Low\nBalance: Low to High",
       default: "Budget: High to Low",
       width: "120",
+      on_change: restartPaging,
+    },
+    {
+      fieldname: "after_value",
+      label: __("After Value"),
+      fieldtype: "Data",
+      hidden: 1,
+    },
+    {
+      fieldname: "after_plot",
+      label: __("After Plot"),
+      fieldtype: "Data",
+      hidden: 1,
     },
   ],
 
@@ -180,6 +195,14 @@ frappe.query_reports["Plot Budget Comparison"].onload = function (report) {
     addBalanceToChart(report);
   });
 
+  report.page.add_inner_button(__("Next Page"), function () {
+    showNextPage(report);
+  });
+
+  report.page.add_inner_button(__("First Page"), function () {
+    showFirstPage(report);
+  });
+
   // Add Budget Utilization Summary button directly
   report.page.add_inner_button(__("Budget Utilization Summary"), function () {
     showBudgetUtilizationSummary(report);
@@ -191,6 +214,38 @@ frappe.query_reports["Plot Budget Comparison"].onload = function (report) {
   }, 300);
 };
 
+// Keyset pagination: ask for the rows after the last one shown
+function showNextPage(report) {
+  if (!report.data || !report.data.length) {
+    frappe.msgprint(__("No more plots to show"));
+    return;
+  }
+
+  // sort_value is the value the server ordered by, so the next page starts right after it
+  let last_row = report.data[report.data.length - 1];
+
+  frappe.query_report.set_filter_value({
+    after_value: String(last_row.sort_value),
+    after_plot: last_row.plot_name,
+  });
+}
+
+// Filter changes start again from the first page
+function restartPaging() {
+  if (frappe.query_report.get_filter_value("after_plot")) {
+    showFirstPage(frappe.query_report);
+  } else {
+    frappe.query_report.refresh();
+  }
+}
+
+function showFirstPage(report) {
+  frappe.query_report.set_filter_value({
+    after_value: "",
+    after_plot: "",
+  });
+}
+
 // Function to show budget utilization summary
 function showBudgetUtilizationSummary(report) {
   if (!report.data || !report.data.length) {
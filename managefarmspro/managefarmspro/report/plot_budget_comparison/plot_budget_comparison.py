@@ -4,7 +4,22 @@
 
 from __future__ import unicode_literals
 import frappe
+from frappe.query_builder import DocType, Order
+from frappe.utils import cint, flt
+from managefarmspro.utils.instrumentation import instrument
 
+# Sort column and direction for each sort_by option. Balance uses the maintained
+# maintenance_balance column rather than a computed expression.
+SORT_OPTIONS = {
+    "Budget: High to Low": ("monthly_maintenance_budget", Order.desc),
+    "Budget: Low to High": ("monthly_maintenance_budget", Order.asc),
+    "Spent: High to Low": ("total_amount_spent", Order.desc),
+    "Spent: Low to High": ("total_amount_spent", Order.asc),
+    "Balance: High to Low": ("maintenance_balance", Order.desc),
+    "Balance: Low to High": ("maintenance_balance", Order.asc),
+}
+
+@instrument()
 def execute(filters=None):
     if not filters:
         filters = {}
@@ -18,62 +33,7 @@ def execute(filters=None):
         {"label": "Balance", "fieldname": "balance", "fieldtype": "Currency", "width": 120}
     ]
     
-    # Build where conditions based on filters
-    conditions = "monthly_maintenance_budget > 0"
-    
-    if filters.get("cluster"):
-        conditions += f" AND cluster = '{filters.get('cluster')}'"
-    
-    if filters.get("plot_location"):
-        conditions += f" AND plot_location = '{filters.get('plot_location')}'"
-    
-    # Handle sorting
-    sort_field = "monthly_maintenance_budget"
-    sort_order = "DESC"
-    
-    if filters.get("sort_by"):
-        sort_option = filters.get("sort_by")
-        
-        if sort_option == "Budget: High to Low":
-            sort_field = "monthly_maintenance_budget"
-            sort_order = "DESC"
-        elif sort_option == "Budget: Low to High":
-            sort_field = "monthly_maintenance_budget"
-            sort_order = "ASC"
-        elif sort_option == "Spent: High to Low":
-            sort_field = "total_amount_spent"
-            sort_order = "DESC"
-        elif sort_option == "Spent: Low to High":
-            sort_field = "total_amount_spent"
-            sort_order = "ASC"
-        elif sort_option == "Balance: High to Low":
-            sort_field = "balance"
-            sort_order = "DESC"
-        elif sort_option == "Balance: Low to High":
-            sort_field = "balance"
-            sort_order = "ASC"
-    
-    # Handle limit
-    limit = filters.get("limit") or 10
-    
-    query = f"""
-        SELECT 
-            plot_name, 
-            cluster,
-            plot_location,
-            monthly_maintenance_budget, 
-            total_amount_spent,
-            (monthly_maintenance_budget - total_amount_spent) as balance
-        FROM 
-            `tabPlot` 
-        WHERE 
-            {conditions}
-        ORDER BY 
-            {sort_field} {sort_order}
-        LIMIT {limit}
-    """
-    
-    data = frappe.db.sql(query, as_dict=1)
+    data = get_data(filters)
     
     chart = {
         "type": "bar",
@@ -87,4 +47,56 @@ def execute(filters=None):
         "colors": ["#4CAF50", "#FF5722"]
     }
     
-    return columns, data, "Plot Budget Comparison", chart
\ No newline at end of file
+    return columns, data, "Plot Budget Comparison", chart
+
+def get_data(filters):
+    """Fetch one page of budgeted plots in the selected order
+    
+    Pages are keyset based: pass the sort_value and plot of the last row seen as after_value
+    and after_plot to get the rows that follow it, so each page is an index range read.
+    The sort columns are Currency fields, stored NOT NULL with a default of 0, so they are
+    compared bare: wrapping them in a function would stop the search index from being used.
+    """
+    Plot = DocType("Plot")
+    
+    sort_field, sort_order = SORT_OPTIONS.get(filters.get("sort_by"), SORT_OPTIONS["Budget: High to Low"])
+    sort_column = Plot[sort_field]
+    
+    conditions = Plot.monthly_maintenance_budget > 0
+    
+    if filters.get("cluster"):
+        conditions &= Plot.cluster == filters.get("cluster")
+    
+    if filters.get("plot_location"):
+        conditions &= Plot.plot_location == filters.get("plot_location")
+    
+    # Continue after the last row of the previous page; the plot name breaks ties in the
+    # same direction as the sort so the pair matches the index order
+    if filters.get("after_plot") and filters.get("after_value") not in (None, ""):
+        after_value = flt(filters.get("after_value"))
+        after_plot = filters.get("after_plot")
+        if sort_order == Order.desc:
+            conditions &= (sort_column < after_value) | ((sort_column == after_value) & (Plot.name < after_plot))
+        else:
+            conditions &= (sort_column > after_value) | ((sort_column == after_value) & (Plot.name > after_plot))
+    
+    # Handle limit
+    limit = cint(filters.get("limit")) or 10
+    
+    return (
+        frappe.qb.from_(Plot)
+        .select(
+            Plot.plot_name,
+            Plot.cluster,
+            Plot.plot_location,
+            Plot.monthly_maintenance_budget,
+            Plot.total_amount_spent,
+            Plot.maintenance_balance.as_("balance"),
+            sort_column.as_("sort_value"),
+        )
+        .where(conditions)
+        .orderby(sort_column, order=sort_order)
+        .orderby(Plot.name, order=sort_order)
+        .limit(limit)
+        .run(as_dict=True)
+    )
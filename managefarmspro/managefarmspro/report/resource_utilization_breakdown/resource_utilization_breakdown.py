@@ -5,9 +5,13 @@ from __future__ import unicode_literals
 import frappe
 import json
 from frappe import _
-from frappe.utils import getdate, add_months, nowdate, flt, get_first_day, get_last_day, formatdate
+from frappe.utils import getdate, add_months, nowdate, flt, cint, get_first_day, get_last_day, formatdate
 from datetime import datetime
+from managefarmspro.utils.instrumentation import instrument
+from managefarmspro.utils.report_cache import get_cached_report
+from managefarmspro.utils.report_filters import ROLLUP_COLUMNS, compile_filters
 
+@instrument()
 def execute(filters=None):
     if not filters:
         filters = {}
@@ -100,100 +104,76 @@ def get_columns(filters):
     
     return columns
 
+# SQL grouping columns for each group_by option; time based groups are labelled in Python
+GROUP_BY_COLUMNS = {
+    "Month": ["YEAR(work_date) AS year", "MONTH(work_date) AS month"],
+    "Quarter": ["YEAR(work_date) AS year", "QUARTER(work_date) AS quarter"],
+    "Year": ["YEAR(work_date) AS year"],
+    "Work Type": ["NULLIF(work_item, '') AS group_key"],
+    "Plot": ["plot AS group_key"],
+    "Cluster": ["NULLIF(cluster, '') AS group_key"],
+}
+
 def get_data(filters):
-    conditions = get_conditions(filters)
+    conditions, values = get_conditions(filters)
     group_by = filters.get("group_by", "Month")
-    
-    # First, get all works that match the conditions
-    works = frappe.db.sql("""
-        SELECT 
-            name,
-            work_name,
-            plot,
-            total_cost,
-            work_date,
-            COALESCE(
-                supervision_charges, 
-                (SELECT supervision_charges FROM `tabPlot` WHERE name = `tabWork`.plot), 
-                0
-            ) as supervision_charges
-        FROM 
-            `tabWork`
+    group_columns = GROUP_BY_COLUMNS.get(group_by, GROUP_BY_COLUMNS["Month"])
+    group_aliases = [column.split(" AS ")[1] for column in group_columns]
+
+    # Aggregate the daily rollup rather than the works themselves, so a long date range
+    # reads one row per day, plot and work item instead of every work and its child rows
+    groups = frappe.db.sql("""
+        SELECT
+            {group_columns},
+            MIN(work_date) as first_work_date,
+            SUM(total_cost) as total_cost,
+            SUM(labor_cost) as labor_cost,
+            SUM(material_cost) as material_cost,
+            SUM(equipment_cost) as equipment_cost,
+            SUM(supervision_cost) as supervision_cost,
+            SUM(work_count) as work_count
+        FROM
+            `tabWork Cost Daily Rollup` r
         WHERE
-            docstatus = 1
+            r.work_count > 0
             {conditions}
-        ORDER BY 
-            work_date
-    """.format(conditions=conditions), filters, as_dict=1)
-    
-    # Define the grouping function based on the selected group_by option
-    def get_group_key(work):
-        if group_by == "Month":
-            # Format: "Jan 2025"
-            return getdate(work.work_date).strftime("%b %Y")
-        elif group_by == "Quarter":
+        GROUP BY
+            {group_aliases}
+        ORDER BY
+            first_work_date
+    """.format(
+        group_columns=", ".join(group_columns),
+        group_aliases=", ".join(group_aliases),
+        conditions=conditions
+    ), values, as_dict=1)
+
+    # Define the label for a group based on the selected group_by option
+    def get_group_key(group):
+        if group_by == "Quarter":
             # Format: "Q1 2025"
-            date = getdate(work.work_date)
-            quarter = ((date.month - 1) // 3) + 1
-            return f"Q{quarter} {date.year}"
+            return f"Q{group.quarter} {group.year}"
         elif group_by == "Year":
             # Format: "2025"
-            return str(getdate(work.work_date).year)
-        elif group_by == "Work Type":
-            # Return the work type
-            return work.work_name
-        elif group_by == "Plot":
-            # Return the plot
-            return work.plot
-        elif group_by == "Cluster":
-            # Get the cluster for the plot
-            plot_info = frappe.db.get_value("Plot", work.plot, "cluster", as_dict=1)
-            return plot_info.cluster if plot_info else "Unknown"
+            return str(group.year)
+        elif group_by in ("Work Type", "Plot", "Cluster"):
+            return group.group_key
         else:
-            # Default to Month
-            return getdate(work.work_date).strftime("%b %Y")
-    
-    # Group works based on the selected criteria
-    grouped_data = {}
-    
-    for work in works:
-        group_key = get_group_key(work)
-        
-        if group_key not in grouped_data:
-            grouped_data[group_key] = {
-                group_by.lower(): group_key,
-                "total_cost": 0,
-                "labor_cost": 0,
-                "material_cost": 0,
-                "equipment_cost": 0,
-                "supervision_cost": 0,
-                "work_count": 0,
-                "sort_key": work.work_date if group_by in ["Month", "Quarter", "Year"] else group_key
-            }
-        
-        # Get cost breakdown for this work
-        labor_cost, material_cost, equipment_cost = get_cost_breakdown(work.name)
-        
-        # Calculate supervision cost
-        try:
-            supervision_percentage = float(work.supervision_charges or 0)
-        except (ValueError, TypeError):
-            supervision_percentage = 0
-            
-        supervision_cost = (work.total_cost * supervision_percentage) / 100
-        supervision_cost = round(supervision_cost, 2)
-        
-        # Add to group totals
-        grouped_data[group_key]["total_cost"] += work.total_cost
-        grouped_data[group_key]["labor_cost"] += labor_cost
-        grouped_data[group_key]["material_cost"] += material_cost
-        grouped_data[group_key]["equipment_cost"] += equipment_cost
-        grouped_data[group_key]["supervision_cost"] += supervision_cost
-        grouped_data[group_key]["work_count"] += 1
-    
+            # Format: "Jan 2025"
+            return datetime(group.year, group.month, 1).strftime("%b %Y")
+
     # Convert to list and calculate percentages
     result = []
-    for key, data in grouped_data.items():
+    for group in groups:
+        data = {
+            group_by.lower(): get_group_key(group),
+            "total_cost": flt(group.total_cost),
+            "labor_cost": flt(group.labor_cost),
+            "material_cost": flt(group.material_cost),
+            "equipment_cost": flt(group.equipment_cost),
+            "supervision_cost": flt(group.supervision_cost),
+            "work_count": cint(group.work_count)
+        }
+
         # Calculate percentages for resource distribution
         total = data["total_cost"]
         if total > 0:
@@ -206,45 +186,14 @@ def get_data(filters):
             data["material_percentage"] = 0
             data["equipment_percentage"] = 0
             data["supervision_percentage"] = 0
-        
+
         result.append(data)
-    
-    # Sort the result based on group_by
-    if group_by in ["Month", "Quarter", "Year"]:
-        # For time-based grouping, sort by date
-        result.sort(key=lambda x: x["sort_key"])
-    else:
-        # For other groupings, sort by total_cost (descending)
+
+    # Time-based groups are already in date order; sort other groupings by total_cost (descending)
+    if group_by in ["Work Type", "Plot", "Cluster"]:
         result.sort(key=lambda x: x["total_cost"], reverse=True)
-    
-    # Remove the sort key from the final output
-    for entry in result:
-        if "sort_key" in entry:
-            del entry["sort_key"]
-    
-    return result
 
-def get_cost_breakdown(work_name):
-    """Get the cost breakdown for a specific work"""
-    labor_cost = frappe.db.sql("""
-        SELECT COALESCE(SUM(total_price), 0) as cost
-        FROM `tabLabor Child`
-        WHERE parent = %s
-    """, work_name, as_dict=1)[0].cost
-    
-    material_cost = frappe.db.sql("""
-        SELECT COALESCE(SUM(total_price), 0) as cost
-        FROM `tabMaterial Child`
-        WHERE parent = %s
-    """, work_name, as_dict=1)[0].cost
-    
-    equipment_cost = frappe.db.sql("""
-        SELECT COALESCE(SUM(total_price), 0) as cost
-        FROM `tabEquipment Child`
-        WHERE parent = %s
-    """, work_name, as_dict=1)[0].cost
-    
-    return labor_cost, material_cost, equipment_cost
+    return result
 
 def get_chart(data, filters):
     """Generate chart data for the report"""
@@ -327,33 +276,22 @@ def get_chart(data, filters):
     return chart
 
 def get_conditions(filters):
-    """Build the WHERE clause conditions based on filters"""
-    conditions = []
-    
-    if filters.get("from_date") and filters.get("to_date"):
-        conditions.append(" AND work_date BETWEEN %(from_date)s AND %(to_date)s")
-    
-    if filters.get("cluster"):
-        # This will need a join with Plot to get the cluster
-        conditions.append(" AND plot IN (SELECT name FROM `tabPlot` WHERE cluster = %(cluster)s)")
-    
-    if filters.get("plot"):
-        conditions.append(" AND plot = %(plot)s")
-        
-    if filters.get("customer"):
-        conditions.append(" AND customer = %(customer)s")
-        
-    if filters.get("work_name"):
-        conditions.append(" AND work_name = %(work_name)s")
-    
-    return " ".join(conditions)
+    """Build the WHERE clause conditions on the rollup and their values from the filters"""
+    conditions, values = compile_filters(filters, ROLLUP_COLUMNS, date_column="work_date", alias="r")
+    return "".join(f" AND {condition}" for condition in conditions), values
 
 @frappe.whitelist()
+@instrument()
 def get_resource_summary(filters):
     """API endpoint to get resource summary data for dashboards"""
     if isinstance(filters, str):
         filters = json.loads(filters)
     
+    return get_cached_report(
+        "Resource Utilization Summary", filters, lambda: get_resource_totals(filters)
+    )
+
+def get_resource_totals(filters):
     data = get_data(filters)
     
     # Calculate totals across all groups
@@ -5,8 +5,12 @@ from __future__ import unicode_literals
 import frappe
 import json
 from frappe import _
-from frappe.utils import getdate, add_months, nowdate, get_first_day, get_last_day
+from frappe.utils import getdate, add_months, nowdate, get_first_day, get_last_day, flt, cint
+from managefarmspro.utils.instrumentation import instrument
+from managefarmspro.utils.report_cache import get_cached_report
+from managefarmspro.utils.report_filters import ROLLUP_COLUMNS, compile_filters
 
+@instrument()
 def execute(filters=None):
     if not filters:
         filters = {}
@@ -79,74 +83,29 @@ def get_columns():
     ]
 
 def get_data(filters):
-    conditions = get_conditions(filters)
-    
-    # Get a list of all work entries that match the conditions
-    works = frappe.db.sql("""
-        SELECT 
-            name,
-            work_name,
-            plot,
-            total_cost,
-            work_date
-        FROM 
-            `tabWork`
-        WHERE
-            docstatus = 1
-            {conditions}
-        ORDER BY 
-            work_date
-    """.format(conditions=conditions), filters, as_dict=1)
-    
-    # Group works by work_name
-    work_groups = {}
-    
-    for work in works:
-        work_name = work.work_name
-        if work_name not in work_groups:
-            work_groups[work_name] = {
-                "work_name": work_name,
-                "work_count": 0,
-                "total_cost": 0,
-                "labour_cost": 0,
-                "material_cost": 0,
-                "equipment_cost": 0,
-                "works": []
-            }
+    # Fold the streamed work type totals into report rows; memory grows with the number of
+    # work types, not with the number of works in the date range
+    result = []
+    total_works = 0
+    
+    for row in iter_work_type_totals(filters):
+        work_count = cint(row.work_count)
+        total_cost = flt(row.total_cost)
+        total_works += work_count
         
-        # Add to the group
-        work_groups[work_name]["work_count"] += 1
-        work_groups[work_name]["total_cost"] += work.total_cost
-        work_groups[work_name]["works"].append(work.name)
-    
-    # Get cost breakdown for each work
-    for work_name, group in work_groups.items():
-        for work_id in group["works"]:
-            labour, material, equipment = get_cost_breakdown(work_id)
-            group["labour_cost"] += labour
-            group["material_cost"] += material
-            group["equipment_cost"] += equipment
-    
-    # Convert to list
-    result = list(work_groups.values())
-    
-    # Calculate totals for percentage
-    total_works = sum([d["work_count"] for d in result])
-    
-    # Calculate percentages and averages, remove the works list
+        result.append({
+            "work_name": row.work_name,
+            "work_count": work_count,
+            "total_cost": total_cost,
+            "avg_cost": round(total_cost / work_count, 2) if work_count else 0,
+            "labour_cost": flt(row.labour_cost),
+            "material_cost": flt(row.material_cost),
+            "equipment_cost": flt(row.equipment_cost)
+        })
+    
+    # Percentages need the overall count, which is only known once the stream is consumed
     for d in result:
-        d["percentage"] = (d["work_count"] / total_works * 100) if total_works else 0
-        d["avg_cost"] = d["total_cost"] / d["work_count"] if d["work_count"] else 0
-        
-        # Round to 2 decimal places
-        d["percentage"] = round(d["percentage"], 2)
-        d["avg_cost"] = round(d["avg_cost"], 2)
-        
-        # Remove the works list 
-        d.pop("works", None)
-    
-    # Sort by work count (descending)
-    result.sort(key=lambda x: x["work_count"], reverse=True)
+        d["percentage"] = round(d["work_count"] / total_works * 100, 2) if total_works else 0
     
     # Apply minimum count filter if present
     if filters.get("min_count"):
@@ -155,27 +114,33 @@ def get_data(filters):
     
     return result
 
-def get_cost_breakdown(work_name):
-    """Get the cost breakdown for a specific work"""
-    labor_cost = frappe.db.sql("""
-        SELECT COALESCE(SUM(total_price), 0) as cost
-        FROM `tabLabor Child`
-        WHERE parent = %s
-    """, work_name, as_dict=1)[0].cost
-    
-    material_cost = frappe.db.sql("""
-        SELECT COALESCE(SUM(total_price), 0) as cost
-        FROM `tabMaterial Child`
-        WHERE parent = %s
-    """, work_name, as_dict=1)[0].cost
-    
-    equipment_cost = frappe.db.sql("""
-        SELECT COALESCE(SUM(total_price), 0) as cost
-        FROM `tabEquipment Child`
-        WHERE parent = %s
-    """, work_name, as_dict=1)[0].cost
-    
-    return labor_cost, material_cost, equipment_cost
+def iter_work_type_totals(filters):
+    """Stream one row per work type, most frequent first, from the daily rollup
+    
+    The rows come through an unbuffered server side cursor, so they are never held as a
+    full result set in the worker.
+    """
+    conditions, values = get_conditions(filters)
+    
+    with frappe.db.unbuffered_cursor():
+        yield from frappe.db.sql("""
+            SELECT 
+                work_item as work_name,
+                SUM(work_count) as work_count,
+                SUM(total_cost) as total_cost,
+                SUM(labor_cost) as labour_cost,
+                SUM(material_cost) as material_cost,
+                SUM(equipment_cost) as equipment_cost
+            FROM 
+                `tabWork Cost Daily Rollup`
+            WHERE
+                work_count > 0
+                {conditions}
+            GROUP BY 
+                work_item
+            ORDER BY 
+                work_count DESC, MIN(work_date)
+        """.format(conditions=conditions), values, as_dict=1, as_iterator=True)
 
 def get_chart(data, filters):
     """Generate chart data for the report"""
@@ -221,28 +186,16 @@ def get_chart(data, filters):
     return chart
 
 def get_conditions(filters):
-    conditions = []
-    
-    if filters.get("from_date") and filters.get("to_date"):
-        conditions.append(" AND work_date BETWEEN %(from_date)s AND %(to_date)s")
-    
-    if filters.get("cluster"):
-        # This will need a join with Plot to get the cluster
-        conditions.append(" AND plot IN (SELECT name FROM `tabPlot` WHERE cluster = %(cluster)s)")
-    
-    if filters.get("plot"):
-        conditions.append(" AND plot = %(plot)s")
-        
-    if filters.get("customer"):
-        conditions.append(" AND customer = %(customer)s")
-    
-    return " ".join(conditions)
+    conditions, values = compile_filters(filters, ROLLUP_COLUMNS, date_column="work_date")
+    return "".join(f" AND {condition}" for condition in conditions), values
 
 @frappe.whitelist()
+@instrument()
 def get_chart_data(filters):
     """API endpoint to get chart data for the dashboard"""
     if isinstance(filters, str):
         filters = json.loads(filters)
     
-    data = get_data(filters)
-    return get_chart(data, filters)
\ No newline at end of file
+    return get_cached_report(
+        "Work Activity Distribution Chart", filters, lambda: get_chart(get_data(filters), filters)
+    )
\ No newline at end of file
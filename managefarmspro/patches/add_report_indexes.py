@@ -0,0 +1,12 @@
+from managefarmspro.managefarmspro.doctype.plot.plot import on_doctype_update as add_plot_indexes
+from managefarmspro.managefarmspro.doctype.work.work import on_doctype_update as add_work_indexes
+from managefarmspro.managefarmspro.doctype.work_cost_daily_rollup.work_cost_daily_rollup import (
+	on_doctype_update as add_rollup_indexes,
+)
+
+
+def execute():
+	# New sites get these through on_doctype_update; existing sites need them added once
+	add_work_indexes()
+	add_plot_indexes()
+	add_rollup_indexes()
@@ -0,0 +1,16 @@
+import frappe
+
+
+def execute():
+	frappe.db.sql(
+		"""
+		UPDATE `tabPlot` p
+		LEFT JOIN (
+			SELECT plot, MAX(work_date) AS last_activity_date
+			FROM `tabWork`
+			WHERE docstatus = 1
+			GROUP BY plot
+		) w ON w.plot = p.name
+		SET p.last_activity_date = w.last_activity_date
+		"""
+	)
@@ -0,0 +1,7 @@
+from managefarmspro.managefarmspro.doctype.plot_monthly_spend.plot_monthly_spend import (
+	rebuild_plot_monthly_spend,
+)
+
+
+def execute():
+	rebuild_plot_monthly_spend()
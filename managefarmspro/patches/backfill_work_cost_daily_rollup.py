@@ -0,0 +1,7 @@
+from managefarmspro.managefarmspro.doctype.work_cost_daily_rollup.work_cost_daily_rollup import (
+	rebuild_work_cost_rollup,
+)
+
+
+def execute():
+	rebuild_work_cost_rollup()
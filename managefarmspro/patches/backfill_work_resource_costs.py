@@ -0,0 +1,38 @@
+import frappe
+
+from managefarmspro.managefarmspro.doctype.work_cost_daily_rollup.work_cost_daily_rollup import (
+	rebuild_work_cost_rollup,
+)
+
+
+def execute():
+	# Historical totals are kept as they were invoiced; only the split and supervision are filled in.
+	# supervision_charges is a NOT NULL Percent by now: the pre-model-sync conversion already
+	# filled empty values from the plot's rate.
+	frappe.db.sql(
+		"""
+		UPDATE `tabWork` w
+		LEFT JOIN (
+			SELECT parent, SUM(total_price) AS cost FROM `tabLabor Child`
+			WHERE parenttype = 'Work' GROUP BY parent
+		) labor ON labor.parent = w.name
+		LEFT JOIN (
+			SELECT parent, SUM(total_price) AS cost FROM `tabMaterial Child`
+			WHERE parenttype = 'Work' GROUP BY parent
+		) material ON material.parent = w.name
+		LEFT JOIN (
+			SELECT parent, SUM(total_price) AS cost FROM `tabEquipment Child`
+			WHERE parenttype = 'Work' GROUP BY parent
+		) equipment ON equipment.parent = w.name
+		SET
+			w.labor_cost = COALESCE(labor.cost, 0),
+			w.material_cost = COALESCE(material.cost, 0),
+			w.equipment_cost = COALESCE(equipment.cost, 0),
+			w.supervision_amount = ROUND(
+				COALESCE(w.total_cost, 0) * w.supervision_charges / 100, 2
+			)
+		"""
+	)
+
+	# The rollup is built from these columns, so refresh it now that they are populated
+	rebuild_work_cost_rollup()
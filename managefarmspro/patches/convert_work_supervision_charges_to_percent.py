@@ -0,0 +1,50 @@
+import re
+
+import frappe
+
+
+def execute():
+	"""Make every stored Work.supervision_charges numeric before the column becomes a Percent.
+
+	Values such as "10 %" or "12,5" keep their number. Empty and unparseable values are filled
+	from the plot's rate, which is what the field fetches, instead of silently counting as zero.
+	"""
+	if not frappe.db.has_column("Work", "supervision_charges"):
+		return
+
+	invalid = []
+	for value in frappe.db.sql_list(
+		"SELECT DISTINCT supervision_charges FROM `tabWork` WHERE supervision_charges IS NOT NULL"
+	):
+		parsed = parse_percent(value)
+		if parsed is None and value.strip():
+			invalid.append(value)
+
+		frappe.db.sql(
+			"UPDATE `tabWork` SET supervision_charges = %s WHERE supervision_charges = %s",
+			(parsed, value),
+		)
+
+	frappe.db.sql(
+		"""
+		UPDATE `tabWork` w
+		INNER JOIN `tabPlot` p ON p.name = w.plot
+		SET w.supervision_charges = p.supervision_charges
+		WHERE w.supervision_charges IS NULL
+		"""
+	)
+
+	if invalid:
+		frappe.log_error(
+			title="Work supervision charges repaired",
+			message="These values could not be read as a percentage and were replaced by the plot's rate: "
+			+ ", ".join(repr(value) for value in invalid),
+		)
+
+
+def parse_percent(value):
+	cleaned = re.sub(r"[\s%]", "", value).replace(",", ".")
+	try:
+		return float(cleaned)
+	except ValueError:
+		return None
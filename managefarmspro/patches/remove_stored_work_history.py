@@ -0,0 +1,6 @@
+import frappe
+
+
+def execute():
+	# Work history on Plot and Cluster is now read from tabWork, drop the copied rows
+	frappe.db.delete("Work Child", {"parenttype": ("in", ["Plot", "Cluster"])})
@@ -0,0 +1,55 @@
+// Work history table shared by the Plot and Cluster forms, loaded page by page from the Work list
+
+frappe.provide("managefarmspro.work_history");
+
+managefarmspro.work_history.render = function (frm, filters, start = 0) {
+  const wrapper = frm.fields_dict.work_history.$wrapper;
+  if (frm.is_new()) {
+    wrapper.empty();
+    return;
+  }
+  if (!start) {
+    wrapper.html(
+      `<table class="table table-bordered table-hover work-history">
+        <thead>
+          <tr>
+            <th>${__("Work ID")}</th>
+            <th>${__("Work Name")}</th>
+            <th>${__("Work Date")}</th>
+            <th>${__("Status")}</th>
+            <th class="text-right">${__("Total Cost")}</th>
+          </tr>
+        </thead>
+        <tbody></tbody>
+      </table>
+      <button class="btn btn-xs btn-default load-more-works hidden">${__("Load More")}</button>`
+    );
+  }
+
+  frappe.call({
+    method: "managefarmspro.managefarmspro.doctype.work.work.get_work_history",
+    args: { ...filters, start: start, page_length: 20 },
+    callback: function (r) {
+      if (!r.message) return;
+      const tbody = wrapper.find("tbody");
+      r.message.works.forEach((work) => {
+        tbody.append(
+          `<tr>
+            <td><a href="/app/work/${encodeURIComponent(work.work_id)}">${frappe.utils.escape_html(work.work_id)}</a></td>
+            <td>${frappe.utils.escape_html(work.work_name || "")}</td>
+            <td>${frappe.datetime.str_to_user(work.work_date) || ""}</td>
+            <td>${__(work.status)}</td>
+            <td class="text-right">${format_currency(work.total_cost)}</td>
+          </tr>`
+        );
+      });
+
+      const next_start = start + r.message.works.length;
+      wrapper
+        .find(".load-more-works")
+        .toggleClass("hidden", !r.message.has_more)
+        .off("click")
+        .on("click", () => managefarmspro.work_history.render(frm, filters, next_start));
+    },
+  });
+};
@@ -0,0 +1,57 @@
+import time
+
+import frappe
+from frappe.utils import get_first_day, getdate
+
+from managefarmspro.managefarmspro.doctype.plot.plot import clear_plot_doc_cache
+from managefarmspro.utils.report_cache import clear_report_cache
+
+
+def reset_monthly_maintenance_balances():
+	"""Monthly reset of every budgeted plot in a single set-based pass.
+
+	Plots not yet reset for the current month get total_amount_spent and maintenance_balance
+	recomputed from the Plot Monthly Spend ledger, and last_maintenance_reset set to the
+	first day of the month.
+	"""
+	started_at = time.monotonic()
+	month_start = get_first_day(getdate())
+	values = {"month_start": month_start}
+
+	pending = frappe.db.sql(
+		"""
+		SELECT COUNT(*)
+		FROM `tabPlot`
+		WHERE monthly_maintenance_budget > 0
+		AND (last_maintenance_reset IS NULL OR last_maintenance_reset < %(month_start)s)
+		""",
+		values,
+	)[0][0]
+
+	if pending:
+		frappe.db.sql(
+			"""
+			UPDATE `tabPlot` p
+			LEFT JOIN `tabPlot Monthly Spend` s
+				ON s.plot = p.name AND s.month_start = %(month_start)s
+			SET
+				p.total_amount_spent = COALESCE(s.total_cost, 0) * (1 + COALESCE(p.supervision_charges, 0) / 100),
+				p.maintenance_balance = p.monthly_maintenance_budget
+					- COALESCE(s.total_cost, 0) * (1 + COALESCE(p.supervision_charges, 0) / 100),
+				p.last_maintenance_reset = %(month_start)s
+			WHERE p.monthly_maintenance_budget > 0
+			AND (p.last_maintenance_reset IS NULL OR p.last_maintenance_reset < %(month_start)s)
+			""",
+			values,
+		)
+		frappe.db.commit()
+		clear_plot_doc_cache()
+		clear_report_cache()
+
+	summary = {
+		"month_start": str(month_start),
+		"plots_reset": pending,
+		"duration_ms": round((time.monotonic() - started_at) * 1000, 2),
+	}
+	frappe.logger("managefarmspro").info(f"Monthly maintenance reset: {summary}")
+	return summary
@@ -0,0 +1,186 @@
+"""End-to-end benchmark of the app's reports, endpoints and document events.
+
+Run against a local throwaway bench site, for example:
+
+	bench --site bench.localhost execute managefarmspro.tests.benchmark.run \
+		--kwargs "{'scales': ['small', 'medium'], 'output': '/tmp/managefarmspro-bench.json'}"
+
+For each scale the synthetic estate is regenerated from a fixed seed, every operation is
+timed `repeat` times and the results are returned, and optionally written, as JSON, so runs
+of different versions can be compared. The generated records are removed afterwards.
+"""
+
+import json
+import random
+import statistics
+import time
+from importlib import import_module
+
+import frappe
+from frappe.utils import add_days, add_months, get_first_day, getdate, now
+
+import managefarmspro
+from managefarmspro.tests.synthetic_data import clear_farm_data, generate_farm_data, make_work
+from managefarmspro.utils.report_cache import clear_report_cache
+
+SCALES = {
+	"small": {"customers": 5, "clusters": 3, "plots": 20, "works": 200},
+	"medium": {"customers": 25, "clusters": 10, "plots": 200, "works": 2000},
+	"large": {"customers": 100, "clusters": 25, "plots": 1000, "works": 20000},
+}
+
+# Reports run over the whole estate; only the invoice preview is scoped to a single plot
+REPORTS = {
+	"low_balance_plots": [],
+	"maintenance_balance_status": [],
+	"monthly_work_cost_trend": ["from_date", "to_date"],
+	"plot_budget_comparison": [],
+	"resource_utilization_breakdown": ["from_date", "to_date"],
+	"work_activity_distribution": ["from_date", "to_date"],
+	"collated_plot_invoice": ["plot", "start_date", "end_date"],
+}
+
+
+def run(scales=None, repeat=5, seed=42, output=None, keep_data=False):
+	"""Benchmark every scale in `scales` and return the results as a dict"""
+	if isinstance(scales, str):
+		scales = [scales]
+
+	results = {
+		"app_version": managefarmspro.__version__,
+		"frappe_version": frappe.__version__,
+		"site": frappe.local.site,
+		"started_at": now(),
+		"seed": seed,
+		"repeat": repeat,
+		"scales": [],
+	}
+
+	for scale in scales or ["small"]:
+		results["scales"].append(run_scale(scale, repeat=repeat, seed=seed, keep_data=keep_data))
+
+	if output:
+		with open(output, "w") as f:
+			json.dump(results, f, indent=1, default=str)
+
+	return results
+
+
+def run_scale(scale, repeat=5, seed=42, keep_data=False):
+	# Remove what an interrupted earlier run may have left behind
+	clear_farm_data()
+
+	started = time.perf_counter()
+	data = generate_farm_data(seed=seed, **SCALES[scale])
+	generation_seconds = round(time.perf_counter() - started, 2)
+
+	try:
+		timings = []
+		plot = data["plots"][0]
+		today = getdate()
+		report_filters = {
+			"from_date": add_months(today, -12),
+			"to_date": today,
+			"start_date": add_months(today, -12),
+			"end_date": today,
+			"plot": plot,
+		}
+
+		for report, fieldnames in REPORTS.items():
+			filters = {fieldname: report_filters[fieldname] for fieldname in fieldnames}
+			timings.append(time_report(report, filters, repeat))
+
+		from managefarmspro.managefarmspro.doctype.work.work import get_plot_balances
+
+		timings.append(time_operation("get_plot_balances", repeat, lambda: get_plot_balances(plot)))
+		timings.extend(time_work_events(data["plots"], repeat, seed))
+		timings.append(time_plot_save(plot, repeat))
+		timings.append(time_invoice(plot, report_filters))
+	finally:
+		frappe.db.rollback()
+		if not keep_data:
+			clear_farm_data(data)
+
+	return {
+		"scale": scale,
+		"size": SCALES[scale],
+		"generation_seconds": generation_seconds,
+		"operations": timings,
+	}
+
+
+def time_report(report, filters, repeat):
+	module = import_module(f"managefarmspro.managefarmspro.report.{report}.{report}")
+
+	def execute():
+		# Measure the report itself, not the result cache
+		clear_report_cache()
+		module.execute(frappe._dict(filters))
+
+	return time_operation(f"report:{report}", repeat, execute)
+
+
+def time_work_events(plots, repeat, seed):
+	rng = random.Random(seed)
+	works = [make_work(rng, rng.choice(plots), add_days(getdate(), -rng.randint(0, 27))) for _ in range(repeat)]
+	pending = list(works)
+
+	submit = time_operation("work:submit", repeat, lambda: pending.pop().submit())
+	pending = [frappe.get_doc("Work", work.name) for work in works]
+	cancel = time_operation("work:cancel", repeat, lambda: pending.pop().cancel())
+
+	return [submit, cancel]
+
+
+def time_plot_save(plot, repeat):
+	def save():
+		doc = frappe.get_doc("Plot", plot)
+		doc.monthly_maintenance_budget = (doc.monthly_maintenance_budget or 0) + 100
+		doc.save(ignore_permissions=True)
+
+	return time_operation("plot:save", repeat, save)
+
+
+def time_invoice(plot, filters):
+	"""Generate one collated invoice; it marks the works invoiced, so it is timed once"""
+	from managefarmspro.managefarmspro.report.collated_plot_invoice.collated_plot_invoice import (
+		download_invoice_pdf,
+	)
+
+	invoice_filters = {
+		"plot": plot,
+		"start_date": get_first_day(filters["start_date"]),
+		"end_date": filters["end_date"],
+	}
+	return time_operation("download_invoice_pdf", 1, lambda: download_invoice_pdf(invoice_filters))
+
+
+def time_operation(name, repeat, fn):
+	"""Run fn `repeat` times and summarise the wall times in milliseconds"""
+	durations = []
+	error = None
+
+	for _ in range(repeat):
+		started = time.perf_counter()
+		try:
+			fn()
+		except Exception as e:
+			# Record the failure (for example a site without the invoicing company) and move on
+			frappe.db.rollback()
+			error = f"{type(e).__name__}: {e}"
+			break
+		durations.append((time.perf_counter() - started) * 1000)
+
+	result = {"operation": name, "runs": len(durations)}
+	if durations:
+		result.update(
+			{
+				"min_ms": round(min(durations), 2),
+				"median_ms": round(statistics.median(durations), 2),
+				"max_ms": round(max(durations), 2),
+			}
+		)
+	if error:
+		result["error"] = error
+
+	return result
@@ -0,0 +1,236 @@
+"""Deterministic synthetic farm data for benchmarks.
+
+generate_farm_data creates customers, clusters, plot locations and budgeted plots, then
+submits works with Labor, Material and Equipment rows spread over the days before
+`end_date`. The same seed, scale and end_date always produce the same records. Everything
+it creates is named with BENCH_PREFIX so clear_farm_data can remove it again.
+
+Meant for a local throwaway bench site; it needs no network access.
+"""
+
+import random
+
+import frappe
+from frappe.utils import add_days, flt, getdate
+
+BENCH_PREFIX = "_Bench"
+
+# Leaf groups for the generated masters; ERPNext rejects group nodes such as "All Item Groups"
+BENCH_ITEM_GROUP = f"{BENCH_PREFIX} Items"
+BENCH_CUSTOMER_GROUP = f"{BENCH_PREFIX} Customers"
+BENCH_TERRITORY = f"{BENCH_PREFIX} Territory"
+
+WORK_ITEMS = [
+	"Lawn Mowing",
+	"Hedge Trimming",
+	"Irrigation Repair",
+	"Weeding",
+	"Fertilising",
+	"Pest Control",
+	"Tree Pruning",
+	"Fence Repair",
+]
+
+# Item name, unit and price range for each resource table
+LABOR_ITEMS = [("Gardener", "Day", 600, 900), ("Helper", "Day", 400, 600), ("Supervisor", "Hour", 150, 250)]
+MATERIAL_ITEMS = [("Fertiliser", "Kg", 40, 90), ("Pesticide", "Litre", 250, 600), ("Mulch", "Bag", 80, 150)]
+EQUIPMENT_ITEMS = [("Mower", "Hour", 200, 350), ("Trimmer", "Hour", 120, 200), ("Sprayer", "Hour", 90, 160)]
+
+
+def generate_farm_data(
+	customers=10, clusters=5, plots=50, works=500, days=365, seed=42, end_date=None, commit_every=100
+):
+	"""Create a synthetic estate and return the names of what was created"""
+	rng = random.Random(seed)
+	end_date = getdate(end_date)
+
+	make_masters()
+
+	customer_names = [make_customer(f"{BENCH_PREFIX} Customer {i:05d}") for i in range(customers)]
+	cluster_names = [make_cluster(f"{BENCH_PREFIX} Cluster {i:04d}") for i in range(clusters)]
+	locations = [make_plot_location(f"{BENCH_PREFIX} Location {i:03d}") for i in range(max(1, clusters // 2))]
+
+	plot_names = []
+	for i in range(plots):
+		plot = frappe.get_doc(
+			{
+				"doctype": "Plot",
+				"plot_name": f"{BENCH_PREFIX} Plot {i:06d}",
+				"plot_number": i + 1,
+				"area": rng.randint(500, 20000),
+				"units": "Sq.Ft",
+				"cluster": rng.choice(cluster_names),
+				"plot_location": rng.choice(locations),
+				"customer_name": rng.choice(customer_names),
+				"monthly_maintenance_budget": rng.choice([0, 5000, 10000, 15000, 25000]),
+				"supervision_charges": rng.choice([0, 5, 10, 12.5]),
+			}
+		).insert(ignore_permissions=True)
+		plot_names.append(plot.name)
+		maybe_commit(i, commit_every)
+
+	work_names = []
+	for i in range(works):
+		work = make_work(rng, rng.choice(plot_names), add_days(end_date, -rng.randint(0, days - 1)))
+		work.submit()
+		work_names.append(work.name)
+		maybe_commit(i, commit_every)
+
+	frappe.db.commit()
+
+	return {
+		"customers": customer_names,
+		"clusters": cluster_names,
+		"plot_locations": locations,
+		"plots": plot_names,
+		"works": work_names,
+	}
+
+
+def make_work(rng, plot, work_date):
+	"""Build an unsaved Work on `plot` with one to three rows in each resource table"""
+	work = frappe.get_doc(
+		{
+			"doctype": "Work",
+			"plot": plot,
+			"work_name": f"{BENCH_PREFIX} {rng.choice(WORK_ITEMS)}",
+			"work_date": work_date,
+			"description": "Synthetic benchmark work",
+		}
+	)
+
+	for table, prefix, items in (
+		("labor_table", "labor", LABOR_ITEMS),
+		("material_table", "material", MATERIAL_ITEMS),
+		("equipment_table", "equipment", EQUIPMENT_ITEMS),
+	):
+		for item_name, unit, low, high in rng.sample(items, rng.randint(1, len(items))):
+			units = rng.randint(1, 8)
+			unit_price = rng.randint(low, high)
+			work.append(
+				table,
+				{
+					f"{prefix}_code": f"{BENCH_PREFIX} {item_name}",
+					f"number_of_{prefix}_units": units,
+					f"{prefix}_unit": unit,
+					"unit_price": unit_price,
+					"total_price": flt(units * unit_price),
+				},
+			)
+
+	return work.insert(ignore_permissions=True)
+
+
+def make_masters():
+	for doctype, name, parent, fieldname in (
+		("Item Group", BENCH_ITEM_GROUP, "All Item Groups", "item_group_name"),
+		("Customer Group", BENCH_CUSTOMER_GROUP, "All Customer Groups", "customer_group_name"),
+		("Territory", BENCH_TERRITORY, "All Territories", "territory_name"),
+	):
+		if not frappe.db.exists(doctype, name):
+			frappe.get_doc(
+				{"doctype": doctype, fieldname: name, f"parent_{frappe.scrub(doctype)}": parent, "is_group": 0}
+			).insert(ignore_permissions=True)
+
+	for work_item in WORK_ITEMS:
+		name = f"{BENCH_PREFIX} {work_item}"
+		if not frappe.db.exists("Work Item", name):
+			frappe.get_doc({"doctype": "Work Item", "work_item_name": name}).insert(ignore_permissions=True)
+
+	for item_name, unit, _low, _high in LABOR_ITEMS + MATERIAL_ITEMS + EQUIPMENT_ITEMS:
+		item_code = f"{BENCH_PREFIX} {item_name}"
+		if not frappe.db.exists("Item", item_code):
+			frappe.get_doc(
+				{
+					"doctype": "Item",
+					"item_code": item_code,
+					"item_name": item_code,
+					"item_group": BENCH_ITEM_GROUP,
+					"stock_uom": "Nos",
+					"is_stock_item": 0,
+				}
+			).insert(ignore_permissions=True)
+
+
+def make_customer(name):
+	if not frappe.db.exists("Customer", name):
+		frappe.get_doc(
+			{
+				"doctype": "Customer",
+				"customer_name": name,
+				"customer_type": "Individual",
+				"customer_group": BENCH_CUSTOMER_GROUP,
+				"territory": BENCH_TERRITORY,
+			}
+		).insert(ignore_permissions=True)
+	return name
+
+
+def make_cluster(name):
+	if not frappe.db.exists("Cluster", name):
+		frappe.get_doc({"doctype": "Cluster", "cluster_name": name}).insert(ignore_permissions=True)
+	return name
+
+
+def make_plot_location(name):
+	if not frappe.db.exists("Plot Location", name):
+		frappe.get_doc({"doctype": "Plot Location", "plot_location": name}).insert(ignore_permissions=True)
+	return name
+
+
+def maybe_commit(index, commit_every):
+	if commit_every and (index + 1) % commit_every == 0:
+		frappe.db.commit()
+
+
+def clear_farm_data(data=None, masters=False):
+	"""Remove the records generate_farm_data created, including ledger and rollup rows.
+
+	Pass the dict generate_farm_data returned to delete exactly those records. Without it,
+	records are matched by BENCH_PREFIX, e.g. to clean up after an interrupted run. With
+	`masters` the shared work items, items and groups go too.
+	"""
+	if data:
+		names = {key: ("in", data[key] or [""]) for key in ("customers", "clusters", "plot_locations", "plots")}
+	else:
+		# "_" is a LIKE wildcard, so escape it to match only the literal prefix
+		pattern = ("like", f"\\{BENCH_PREFIX} %")
+		names = dict.fromkeys(("customers", "clusters", "plot_locations", "plots"), pattern)
+
+	works = frappe.get_all("Work", filters={"plot": names["plots"]}, pluck="name")
+	if works:
+		for child_doctype in ("Labor Child", "Material Child", "Equipment Child"):
+			frappe.db.delete(child_doctype, {"parenttype": "Work", "parent": ("in", works)})
+		frappe.db.delete("Work", {"name": ("in", works)})
+
+	frappe.db.delete("Plot Monthly Spend", {"plot": names["plots"]})
+	frappe.db.delete("Work Cost Daily Rollup", {"plot": names["plots"]})
+	frappe.db.delete("Plot Child", {"plot": names["plots"]})
+	frappe.db.delete("Plot", {"name": names["plots"]})
+	frappe.db.delete("Cluster", {"name": names["clusters"]})
+	frappe.db.delete("Plot Location", {"name": names["plot_locations"]})
+	frappe.db.delete("Customer", {"name": names["customers"]})
+
+	if masters:
+		clear_masters()
+
+	frappe.db.commit()
+
+
+def clear_masters():
+	"""Remove what make_masters created, through delete_doc so child rows and the group trees are
+	kept consistent"""
+	masters = [("Work Item", f"{BENCH_PREFIX} {work_item}") for work_item in WORK_ITEMS]
+	masters += [
+		("Item", f"{BENCH_PREFIX} {item_name}")
+		for item_name, _unit, _low, _high in LABOR_ITEMS + MATERIAL_ITEMS + EQUIPMENT_ITEMS
+	]
+	masters += [
+		("Item Group", BENCH_ITEM_GROUP),
+		("Customer Group", BENCH_CUSTOMER_GROUP),
+		("Territory", BENCH_TERRITORY),
+	]
+
+	for doctype, name in masters:
+		if frappe.db.exists(doctype, name):
+			frappe.delete_doc(doctype, name, force=True, ignore_permissions=True)
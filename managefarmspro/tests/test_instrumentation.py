@@ -0,0 +1,53 @@
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from managefarmspro.utils.instrumentation import instrument, instrumented
+
+
+class TestInstrumentation(FrappeTestCase):
+	def setUp(self):
+		self.enabled = frappe.conf.get("managefarmspro_instrumentation")
+		frappe.conf.managefarmspro_instrumentation = 1
+
+	def tearDown(self):
+		frappe.conf.managefarmspro_instrumentation = self.enabled
+
+	def test_counts_queries_and_rows(self):
+		with instrumented("test") as stats:
+			frappe.db.sql("SELECT 1 UNION ALL SELECT 2")
+			frappe.db.sql("SELECT 1")
+
+		self.assertEqual(stats.query_count, 2)
+		self.assertEqual(stats.rows_returned, 3)
+		self.assertGreaterEqual(stats.wall_time, stats.db_time)
+		self.assertNotIn("sql", frappe.local.db.__dict__)
+
+	def test_nested_operations_include_inner_queries(self):
+		with instrumented("outer") as outer:
+			frappe.db.sql("SELECT 1")
+			with instrumented("inner") as inner:
+				frappe.db.sql("SELECT 1")
+
+		self.assertEqual(inner.query_count, 1)
+		self.assertEqual(outer.query_count, 2)
+
+	def test_disabled_leaves_db_untouched(self):
+		frappe.conf.managefarmspro_instrumentation = 0
+
+		with instrumented("test") as stats:
+			self.assertNotIn("sql", frappe.local.db.__dict__)
+
+		self.assertIsNone(stats)
+		self.assertEqual(instrument()(lambda value: value)(3), 3)
+
+	def test_keeps_a_shadow_installed_during_the_operation(self):
+		db = frappe.local.db
+		sql = db.sql
+
+		with instrumented("test"):
+			db.sql = patched = lambda *args, **kwargs: sql(*args, **kwargs)
+
+		try:
+			self.assertIs(db.__dict__.get("sql"), patched)
+		finally:
+			del db.sql
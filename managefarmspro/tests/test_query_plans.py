@@ -0,0 +1,238 @@
+"""EXPLAIN checks for the app's hot queries.
+
+Each test calls the real report, endpoint or doc event code against a small synthetic estate,
+captures the statements it sends to the database and EXPLAINs them. The expected index must be
+chosen or at least usable for the table the query is filtered on: a query that loses its index
+(a dropped index, a predicate wrapped in a function, a subquery in place of a join) fails here
+before it turns into a full table scan in production.
+
+The access type is not checked. On tables this small the optimizer may legitimately prefer a
+full scan over an index it could use, which says nothing about the plan on a real estate.
+"""
+
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_months, get_first_day, get_last_day, getdate
+
+from managefarmspro.managefarmspro.doctype.plot_monthly_spend.plot_monthly_spend import get_month_work_cost
+from managefarmspro.managefarmspro.doctype.work.work import get_work_history
+from managefarmspro.managefarmspro.report.collated_plot_invoice import collated_plot_invoice
+from managefarmspro.managefarmspro.report.low_balance_plots import low_balance_plots
+from managefarmspro.managefarmspro.report.maintenance_balance_status import maintenance_balance_status
+from managefarmspro.managefarmspro.report.monthly_work_cost_trend import monthly_work_cost_trend
+from managefarmspro.managefarmspro.report.plot_budget_comparison import plot_budget_comparison
+from managefarmspro.managefarmspro.report.resource_utilization_breakdown import (
+	resource_utilization_breakdown,
+)
+from managefarmspro.managefarmspro.report.work_activity_distribution import work_activity_distribution
+from managefarmspro.tests.synthetic_data import clear_farm_data, generate_farm_data
+
+ANALYZED_TABLES = [
+	"tabPlot",
+	"tabWork",
+	"tabPlot Monthly Spend",
+	"tabWork Cost Daily Rollup",
+	"tabLabor Child",
+	"tabMaterial Child",
+	"tabEquipment Child",
+]
+
+
+@contextmanager
+def capture_queries():
+	"""Collect every statement sent through frappe.db.sql, with its values filled in"""
+	queries = []
+	db = frappe.local.db
+	sql = db.sql
+
+	def spy(*args, **kwargs):
+		result = sql(*args, **kwargs)
+		queries.append(db.last_query)
+		return result
+
+	with patch.object(db, "sql", spy):
+		yield queries
+
+
+class TestQueryPlans(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		clear_farm_data()
+		cls.data = generate_farm_data(customers=10, clusters=10, plots=50, works=300, seed=7)
+		for table in ANALYZED_TABLES:
+			frappe.db.sql(f"ANALYZE TABLE `{table}`")
+
+		# A budgeted plot with submitted works, and its cluster and customer
+		work = frappe.db.sql(
+			"""
+			SELECT w.name, w.plot, p.cluster, p.customer_name
+			FROM `tabWork` w
+			INNER JOIN `tabPlot` p ON p.name = w.plot
+			WHERE w.docstatus = 1 AND p.monthly_maintenance_budget > 0 AND p.name IN %(plots)s
+			ORDER BY w.name
+			LIMIT 1
+			""",
+			{"plots": tuple(cls.data["plots"])},
+			as_dict=True,
+		)[0]
+		cls.work, cls.plot, cls.cluster, cls.customer = work.name, work.plot, work.cluster, work.customer_name
+		cls.to_date = getdate()
+		cls.from_date = add_months(cls.to_date, -12)
+
+	@classmethod
+	def tearDownClass(cls):
+		# generate_farm_data commits, so remove the estate and its masters rather than rolling back
+		clear_farm_data(cls.data, masters=True)
+		super().tearDownClass()
+
+	def assertReadsThroughIndex(self, queries, table, alias=None, index=None):
+		"""EXPLAIN each captured statement on `table` and check an index can serve the read.
+
+		The index must be the chosen key or one of the possible keys. `index` may be one index
+		name or a tuple of acceptable ones; without it any index will do.
+		"""
+		alias = alias or table
+		indexes = (index,) if isinstance(index, str) else index
+		statements = [
+			query
+			for query in queries
+			if f"`{table}`" in query and query.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE"))
+		]
+		self.assertTrue(statements, f"no captured statement reads {table}: {queries}")
+
+		for statement in statements:
+			plan = frappe.db.sql(f"EXPLAIN {statement}", as_dict=True)
+			rows = [row for row in plan if row.table == alias]
+			if not rows and any("optimized away" in (row.Extra or "") for row in plan):
+				# MIN/MAX answered from the index alone, without reading the table
+				continue
+			self.assertTrue(rows, f"{alias} is not in the plan: {plan}\n{statement}")
+
+			for row in rows:
+				usable = {row.key, *(row.possible_keys or "").split(",")} - {None, ""}
+				self.assertTrue(usable, f"no index usable for {alias}: {plan}\n{statement}")
+				if indexes:
+					self.assertTrue(
+						usable.intersection(indexes), f"none of {indexes} usable for {alias}: {plan}\n{statement}"
+					)
+
+	def test_month_spend_lookup(self):
+		with capture_queries() as queries:
+			get_month_work_cost(self.plot)
+
+		self.assertReadsThroughIndex(queries, "tabPlot Monthly Spend", index="unique_plot_month")
+
+	def test_low_balance_joins_month_spend_by_key(self):
+		with capture_queries() as queries:
+			low_balance_plots.get_data(10**9)
+
+		self.assertReadsThroughIndex(queries, "tabPlot Monthly Spend", alias="s", index="unique_plot_month")
+
+	def test_plot_totals_on_submit(self):
+		work = frappe.get_doc("Work", self.work)
+		with capture_queries() as queries:
+			work.update_plot_totals()
+
+		self.assertReadsThroughIndex(queries, "tabPlot Monthly Spend", index="unique_plot_month")
+		self.assertReadsThroughIndex(queries, "tabPlot", index="PRIMARY")
+
+	def test_last_activity_on_cancel(self):
+		work = frappe.get_doc("Work", self.work)
+		with capture_queries() as queries:
+			work.update_plot_last_activity(cancelled=True)
+
+		self.assertReadsThroughIndex(queries, "tabPlot", index="PRIMARY")
+		self.assertReadsThroughIndex(queries, "tabWork", index="plot_docstatus_work_date_index")
+
+	def test_work_history_of_plot(self):
+		with capture_queries() as queries:
+			get_work_history(plot=self.plot)
+
+		self.assertReadsThroughIndex(queries, "tabWork", alias="w", index="plot_docstatus_work_date_index")
+
+	def test_work_history_of_cluster(self):
+		with capture_queries() as queries:
+			get_work_history(cluster=self.cluster)
+
+		self.assertReadsThroughIndex(queries, "tabPlot", alias="p", index="cluster_index")
+		self.assertReadsThroughIndex(queries, "tabWork", alias="w", index="plot_docstatus_work_date_index")
+
+	def test_maintenance_status_by_customer(self):
+		with capture_queries() as queries:
+			maintenance_balance_status.get_data(frappe._dict(customer=self.customer, balance_threshold=20))
+
+		self.assertReadsThroughIndex(queries, "tabPlot", alias="p", index="customer_name_index")
+
+	def test_plot_budget_comparison_keyset_page(self):
+		with capture_queries() as queries:
+			plot_budget_comparison.get_data(
+				frappe._dict(cluster=self.cluster, after_value="1000000", after_plot=self.plot)
+			)
+
+		self.assertReadsThroughIndex(queries, "tabPlot", index="cluster_index")
+
+	def test_plot_budget_comparison_sorts_through_index(self):
+		with capture_queries() as queries:
+			plot_budget_comparison.get_data(frappe._dict())
+
+		# The sort column is compared bare, so its search index serves the order and the range
+		self.assertReadsThroughIndex(queries, "tabPlot", index="monthly_maintenance_budget")
+
+	def test_monthly_trend_for_one_month(self):
+		month_start = get_first_day(self.to_date)
+		with capture_queries() as queries:
+			monthly_work_cost_trend.get_data(
+				frappe._dict(from_date=month_start, to_date=get_last_day(month_start))
+			)
+
+		self.assertReadsThroughIndex(queries, "tabWork Cost Daily Rollup", index="unique_rollup_key")
+
+	def test_monthly_trend_of_plot(self):
+		with capture_queries() as queries:
+			monthly_work_cost_trend.get_data(
+				frappe._dict(plot=self.plot, from_date=self.from_date, to_date=self.to_date)
+			)
+
+		self.assertReadsThroughIndex(queries, "tabWork Cost Daily Rollup", index="plot_work_date_index")
+
+	def test_work_activity_of_cluster(self):
+		with capture_queries() as queries:
+			work_activity_distribution.get_data(
+				frappe._dict(cluster=self.cluster, from_date=self.from_date, to_date=self.to_date)
+			)
+
+		self.assertReadsThroughIndex(queries, "tabWork Cost Daily Rollup", index="cluster_work_date_index")
+
+	def test_resource_utilization_of_customer(self):
+		with capture_queries() as queries:
+			resource_utilization_breakdown.get_data(
+				frappe._dict(customer=self.customer, from_date=self.from_date, to_date=self.to_date)
+			)
+
+		self.assertReadsThroughIndex(
+			queries, "tabWork Cost Daily Rollup", alias="r", index="customer_work_date_index"
+		)
+
+	def test_invoice_works_and_items_of_plot(self):
+		filters = {"plot": self.plot, "start_date": self.from_date, "end_date": self.to_date}
+		with capture_queries() as queries:
+			collated_plot_invoice.get_data(filters)
+
+		self.assertReadsThroughIndex(
+			queries,
+			"tabWork",
+			index=("plot_docstatus_work_date_index", "docstatus_invoice_number_index"),
+		)
+		for child_doctype in ("Labor Child", "Material Child", "Equipment Child"):
+			self.assertReadsThroughIndex(queries, f"tab{child_doctype}", index="parent")
+
+	def test_plots_to_invoice_of_cluster(self):
+		with capture_queries() as queries:
+			collated_plot_invoice.get_plots_to_invoice(self.from_date, self.to_date, cluster=self.cluster)
+
+		self.assertReadsThroughIndex(queries, "tabPlot", alias="p", index="cluster_index")
+		self.assertReadsThroughIndex(queries, "tabWork", alias="w", index="plot_docstatus_work_date_index")
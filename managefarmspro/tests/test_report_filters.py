@@ -0,0 +1,74 @@
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from managefarmspro.utils.report_filters import (
+	PLOT_COLUMNS,
+	ROLLUP_COLUMNS,
+	WORK_COLUMNS,
+	compile_filters,
+)
+
+
+def explain(query, values):
+	return frappe.db.sql(f"EXPLAIN {query}", values, as_dict=True)
+
+
+class TestReportFilters(FrappeTestCase):
+	def test_filters_compile_to_bound_predicates(self):
+		conditions, values = compile_filters(
+			{
+				"from_date": "2025-01-01",
+				"to_date": "2025-01-31",
+				"cluster": "North' OR '1'='1",
+				"work_name": "",
+			},
+			ROLLUP_COLUMNS,
+			date_column="work_date",
+			alias="r",
+		)
+
+		self.assertEqual(
+			conditions,
+			["r.work_date >= %(from_date)s", "r.work_date <= %(to_date)s", "r.cluster = %(cluster)s"],
+		)
+		self.assertEqual(values["cluster"], "North' OR '1'='1")
+		self.assertNotIn("work_name", values)
+
+	def test_list_values_compile_to_in(self):
+		conditions, values = compile_filters({"plot": ["_Test Plot", "_Test Plot 2"]}, PLOT_COLUMNS, alias="p")
+
+		self.assertEqual(conditions, ["p.name IN %(plot)s"])
+		self.assertEqual(values["plot"], ("_Test Plot", "_Test Plot 2"))
+
+	def test_cluster_filter_on_works_joins_plot(self):
+		conditions, values = compile_filters({"cluster": "_Test Cluster"}, WORK_COLUMNS)
+		plan = explain(
+			f"""
+			SELECT w.name
+			FROM `tabWork` w
+			INNER JOIN `tabPlot` p ON p.name = w.plot
+			WHERE {" AND ".join(conditions)}
+			""",
+			values,
+		)
+
+		self.assertFalse([row for row in plan if "SUBQUERY" in (row.select_type or "").upper()])
+		self.assertIn("PRIMARY", [row.possible_keys for row in plan if row.table == "p"][0] or "")
+
+	def test_date_range_on_rollup_can_use_its_key(self):
+		conditions, values = compile_filters(
+			{"from_date": "2025-01-01", "to_date": "2025-12-31", "plot": "_Test Plot"},
+			ROLLUP_COLUMNS,
+			date_column="work_date",
+		)
+		plan = explain(
+			f"""
+			SELECT work_item, SUM(total_cost)
+			FROM `tabWork Cost Daily Rollup`
+			WHERE {" AND ".join(conditions)}
+			GROUP BY work_item
+			""",
+			values,
+		)
+
+		self.assertIn("unique_rollup_key", plan[0].possible_keys or "")
@@ -0,0 +1,142 @@
+"""Query count and latency instrumentation for the app's hot paths.
+
+Set `managefarmspro_instrumentation` in site config to enable it. Operations wrapped with
+`instrument` or run inside `instrumented` then record their query count, DB time, wall time
+and rows returned. Operations slower than `managefarmspro_slow_operation_threshold_ms`
+(default 1000) are written to Slow Operation Log.
+
+While disabled both reduce to one site config lookup and frappe.db is left untouched. While
+an operation runs, `sql` is wrapped on the current connection only, so other requests and
+workers are never affected.
+"""
+
+import functools
+import time
+from contextlib import contextmanager
+
+import frappe
+from frappe.deferred_insert import deferred_insert
+from frappe.utils import flt, now
+
+SLOW_OPERATION_THRESHOLD_MS = 1000
+
+
+def is_enabled():
+	return bool(frappe.conf.get("managefarmspro_instrumentation"))
+
+
+def get_threshold():
+	return flt(frappe.conf.get("managefarmspro_slow_operation_threshold_ms", SLOW_OPERATION_THRESHOLD_MS))
+
+
+def instrument(operation=None):
+	"""Decorator that runs the function inside `instrumented`.
+
+	The operation defaults to the function's dotted path. Apply it below @frappe.whitelist()
+	so the whitelisted callable is the instrumented one.
+	"""
+
+	def decorator(fn):
+		name = operation or f"{fn.__module__}.{fn.__qualname__}"
+
+		@functools.wraps(fn)
+		def wrapper(*args, **kwargs):
+			if not frappe.conf.get("managefarmspro_instrumentation"):
+				return fn(*args, **kwargs)
+
+			with instrumented(name):
+				return fn(*args, **kwargs)
+
+		return wrapper
+
+	return decorator
+
+
+@contextmanager
+def instrumented(operation):
+	"""Measure the enclosed block and yield its stats, or None while disabled.
+
+	Nested operations are each measured in full, so an endpoint's counts include the
+	report it runs.
+	"""
+	if not is_enabled():
+		yield None
+		return
+
+	stats = frappe._dict(
+		operation=operation, started_at=now(), query_count=0, db_time=0.0, rows_returned=0, wall_time=0.0
+	)
+	active = get_active_operations()
+	stop_tracing = start_tracing(frappe.local.db, active) if not active else None
+	active.append(stats)
+
+	started = time.perf_counter()
+	try:
+		yield stats
+	finally:
+		stats.wall_time = time.perf_counter() - started
+		active.remove(stats)
+		if stop_tracing:
+			stop_tracing()
+
+		if stats.wall_time * 1000 >= get_threshold():
+			log_slow_operation(stats)
+
+
+def get_active_operations():
+	if not hasattr(frappe.local, "managefarmspro_operations"):
+		frappe.local.managefarmspro_operations = []
+	return frappe.local.managefarmspro_operations
+
+
+def start_tracing(db, active):
+	"""Shadow `sql` on this connection only and return a function that removes the shadow"""
+	# An existing instance override is kept and called through; otherwise the class method is
+	# looked up on every call, so class level patches such as assertQueryCount still see queries
+	previous = db.__dict__.get("sql")
+
+	@functools.wraps(type(db).sql)
+	def traced_sql(*args, **kwargs):
+		started = time.perf_counter()
+		result = None
+		try:
+			result = previous(*args, **kwargs) if previous else type(db).sql(db, *args, **kwargs)
+			return result
+		finally:
+			elapsed = time.perf_counter() - started
+			# Iterators from as_iterator are consumed later, so their rows are not counted
+			rows = len(result) if isinstance(result, (list, tuple)) else 0
+			for stats in active:
+				stats.query_count += 1
+				stats.db_time += elapsed
+				stats.rows_returned += rows
+
+	def stop_tracing():
+		# Only undo our own shadow; one installed on top of it since belongs to someone else
+		if db.__dict__.get("sql") is not traced_sql:
+			return
+		if previous:
+			db.sql = previous
+		else:
+			del db.sql
+
+	db.sql = traced_sql
+	return stop_tracing
+
+
+def log_slow_operation(stats):
+	# Queued rather than inserted, so the log survives a rollback of the operation's transaction
+	deferred_insert(
+		"Slow Operation Log",
+		[
+			{
+				"operation": stats.operation[:140],
+				"user": frappe.session.user if getattr(frappe.local, "session", None) else None,
+				"started_at": stats.started_at,
+				"wall_time_ms": flt(stats.wall_time * 1000, 2),
+				"db_time_ms": flt(stats.db_time * 1000, 2),
+				"query_count": stats.query_count,
+				"rows_returned": stats.rows_returned,
+			}
+		],
+	)
@@ -0,0 +1,120 @@
+"""Shared result cache for the app's reports and dashboard endpoints.
+
+Results are stored in frappe.cache under a key made of the report name, the normalised
+filters and the current generation of every scope the filters touch. Invalidating a scope
+bumps its generation, so stale entries are never read again and simply expire.
+
+Scopes:
+- "global": every cached result, bumped by clear_report_cache
+- "plot:<name>" / "cluster:<name>": results filtered to that plot or cluster
+- "all": results not filtered to a plot or cluster, bumped by any invalidation
+"""
+
+import hashlib
+import json
+from functools import partial
+
+import frappe
+from frappe.utils import cint
+
+from managefarmspro.utils.instrumentation import instrument
+
+REPORT_CACHE_TTL = 300
+GENERATIONS_KEY = "managefarmspro:report_cache:generations"
+STATS_KEY = "managefarmspro:report_cache:stats"
+
+
+def get_cached_report(report_name, filters, compute):
+	"""Return compute() for these filters, from the cache when a current entry exists"""
+	key = get_cache_key(report_name, filters)
+	cached = frappe.cache.get_value(key)
+	if cached is not None:
+		record_lookup(report_name, hit=True)
+		return cached[0]
+
+	record_lookup(report_name, hit=False)
+	result = compute()
+	frappe.cache.set_value(key, (result,), expires_in_sec=get_ttl())
+	return result
+
+
+def invalidate_report_cache(plot=None, cluster=None, after_commit=False):
+	"""Drop cached results that could include this plot or cluster.
+
+	With `after_commit` the generations are bumped once the current transaction commits, so a
+	concurrent request can't cache the figures from before the write under the new generation.
+	"""
+	if after_commit:
+		frappe.db.after_commit.add(partial(invalidate_report_cache, plot=plot, cluster=cluster))
+		return
+
+	scopes = ["all"]
+	if plot:
+		scopes.append(f"plot:{plot}")
+	if cluster:
+		scopes.append(f"cluster:{cluster}")
+
+	key = frappe.cache.make_key(GENERATIONS_KEY)
+	for scope in scopes:
+		frappe.cache.hincrby(key, scope, 1)
+
+
+def clear_report_cache():
+	"""Drop every cached report result"""
+	frappe.cache.hincrby(frappe.cache.make_key(GENERATIONS_KEY), "global", 1)
+
+
+@frappe.whitelist()
+@instrument()
+def get_report_cache_stats():
+	"""Hit and miss counts of the report cache, per report"""
+	frappe.only_for("System Manager")
+
+	# hincrby stores raw integers, so read them back without the wrapper's unpickling
+	fields = frappe.cache.hkeys(STATS_KEY)
+	counts = frappe.cache.hmget(frappe.cache.make_key(STATS_KEY), fields) if fields else []
+
+	stats = {}
+	for field, count in zip(fields, counts):
+		report_name, outcome = frappe.safe_decode(field).rsplit(":", 1)
+		stats.setdefault(report_name, {"hits": 0, "misses": 0})[outcome] = cint(frappe.safe_decode(count))
+
+	for report_stats in stats.values():
+		lookups = report_stats["hits"] + report_stats["misses"]
+		report_stats["hit_rate"] = round(report_stats["hits"] / lookups * 100, 2) if lookups else 0
+
+	return stats
+
+
+def get_cache_key(report_name, filters):
+	filters = normalise_filters(filters)
+	scopes = ["global"]
+	if filters.get("plot"):
+		scopes.append(f"plot:{filters['plot']}")
+	if filters.get("cluster"):
+		scopes.append(f"cluster:{filters['cluster']}")
+	if len(scopes) == 1:
+		scopes.append("all")
+
+	generations = frappe.cache.hmget(frappe.cache.make_key(GENERATIONS_KEY), scopes)
+	digest = hashlib.sha1(
+		json.dumps([filters, [cint(frappe.safe_decode(g or 0)) for g in generations]], sort_keys=True, default=str).encode()
+	).hexdigest()
+
+	return f"managefarmspro:report_cache:{frappe.scrub(report_name)}:{digest}"
+
+
+def normalise_filters(filters):
+	"""Filters as a plain dict without empty values, so equivalent requests share a key"""
+	if isinstance(filters, str):
+		filters = json.loads(filters)
+
+	return {key: value for key, value in (filters or {}).items() if value not in (None, "", [], {})}
+
+
+def record_lookup(report_name, hit):
+	frappe.cache.hincrby(frappe.cache.make_key(STATS_KEY), f"{report_name}:{'hits' if hit else 'misses'}", 1)
+
+
+def get_ttl():
+	return cint(frappe.conf.get("managefarmspro_report_cache_ttl")) or REPORT_CACHE_TTL
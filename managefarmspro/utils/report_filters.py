@@ -0,0 +1,69 @@
+"""Compile the common report filters into parameterised SQL predicates.
+
+Every predicate compares a plain column with a bound value, so it can use an index on that
+column. Filters on plot attributes of a Work are compared against the joined Plot row
+(`p`) rather than through a subquery.
+"""
+
+from frappe.utils import getdate
+
+# Filter name -> column, for each source the reports read from
+ROLLUP_COLUMNS = {
+	"cluster": "cluster",
+	"plot": "plot",
+	"customer": "customer",
+	"work_name": "work_item",
+}
+
+PLOT_COLUMNS = {
+	"cluster": "cluster",
+	"plot": "name",
+	"customer": "customer_name",
+	"plot_location": "plot_location",
+}
+
+# tabWork as `w` joined to tabPlot as `p`
+WORK_COLUMNS = {
+	"cluster": "p.cluster",
+	"plot": "w.plot",
+	"customer": "w.customer",
+	"plot_location": "p.plot_location",
+	"work_name": "w.work_name",
+}
+
+
+def compile_filters(filters, columns, date_column=None, alias=None):
+	"""Return (conditions, values) for the filters that are set.
+
+	conditions is a list of predicates with %(name)s placeholders and values holds their
+	parameters. from_date and to_date bound `date_column` when it is given. List values
+	compile to IN. Unqualified columns are prefixed with `alias`.
+	"""
+	filters = filters or {}
+	conditions = []
+	values = {}
+
+	def column(name):
+		return f"{alias}.{name}" if alias and "." not in name else name
+
+	if date_column:
+		if filters.get("from_date"):
+			conditions.append(f"{column(date_column)} >= %(from_date)s")
+			values["from_date"] = getdate(filters.get("from_date"))
+		if filters.get("to_date"):
+			conditions.append(f"{column(date_column)} <= %(to_date)s")
+			values["to_date"] = getdate(filters.get("to_date"))
+
+	for fieldname, target in columns.items():
+		value = filters.get(fieldname)
+		if value in (None, "", [], ()):
+			continue
+
+		if isinstance(value, (list, tuple)):
+			conditions.append(f"{column(target)} IN %({fieldname})s")
+			values[fieldname] = tuple(value)
+		else:
+			conditions.append(f"{column(target)} = %({fieldname})s")
+			values[fieldname] = value
+
+	return conditions, values